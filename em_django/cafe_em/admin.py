@@ -1,18 +1,80 @@
-from typing import Any
+from typing import Any, Dict, Iterator, Optional, Tuple
 
 from django.contrib import admin
+from django.db.models import Q, QuerySet
+from django.db.models.functions import Lower
+from django.http import HttpRequest
 
-
+from .filters import number_range_condition, search_orders
+from .forms import OrderTotalFormSet
 from .models import Dish, Order, OrderItem
 
 
+class NumberRangeFilter(admin.SimpleListFilter):
+    """
+    Фильтр по числовому полю с полем ввода вместо списка всех значений.
+    Принимает число или диапазон "a-b".
+    """
+
+    template = "admin/cafe_em/input_filter.html"
+    placeholder = "1 или 1-10"
+    field_name: str
+
+    def lookups(
+        self,
+        request: HttpRequest,
+        model_admin: admin.ModelAdmin,
+    ) -> Tuple[Tuple[str, str], ...]:
+        return (("", ""),)
+
+    def choices(self, changelist: Any) -> Iterator[Dict[str, Any]]:
+        all_choice: Dict[str, Any] = next(super().choices(changelist))
+        all_choice["query_parts"] = [
+            (name, value)
+            for name, values in changelist.get_filters_params().items()
+            if name != self.parameter_name
+            for value in values
+        ]
+        yield all_choice
+
+    def queryset(
+        self,
+        request: HttpRequest,
+        queryset: QuerySet,
+    ) -> Optional[QuerySet]:
+        if not self.value():
+            return queryset
+        condition: Optional[Q] = number_range_condition(
+            self.field_name,
+            self.value(),
+        )
+        if condition is None:
+            return queryset.none()
+        return queryset.filter(condition)
+
+
+class OrderIdFilter(NumberRangeFilter):
+    title = "ID"
+    parameter_name = "id_range"
+    field_name = "id"
+
+
+class TableNumberFilter(NumberRangeFilter):
+    title = "номеру стола"
+    parameter_name = "table_range"
+    field_name = "table_number"
+
+
 class OrderItemInline(admin.TabularInline):
     """
     Встроенная модель для отображения позиций заказа.
+    Блюдо выбирается поиском по названию, а не из списка всего меню.
     """
 
     model = OrderItem
+    formset = OrderTotalFormSet
     extra = 1
+    autocomplete_fields: tuple[str, ...] = ("dish",)
 
 
 @admin.register(Dish)
@@ -20,6 +82,9 @@ class DishAdmin(admin.ModelAdmin):
     """
     Администрирование модели Dish.
     Отображает их ID, названием и ценой.
+    Поиск по началу названия в SQLite использует индекс
+    dish_name_nocase_idx. Сортировка без учёта регистра - через
+    Lower, который есть на всех БД.
     """
 
     list_display: tuple[str, str, str] = (
@@ -27,6 +92,8 @@ class DishAdmin(admin.ModelAdmin):
         "name",
         "price",
     )
+    search_fields: tuple[str, ...] = ("^name",)
+    ordering = (Lower("name"),)
 
 
 @admin.register(Order)
@@ -34,6 +101,8 @@ class OrderAdmin(admin.ModelAdmin):
     """
     Администрирование модели Order.
     Отображает список заказов с номером стола, статусом и общей суммой заказа.
+    Сумма берётся из total_amount, фильтры по id и номеру стола - поля ввода,
+    поиск идёт по индексам, как в API.
     """
 
     list_display: tuple[str, str, str, str] = (
@@ -42,15 +111,28 @@ class OrderAdmin(admin.ModelAdmin):
         "status",
         "total_price",
     )
-    list_filter: tuple[str, ...] = (
-        "id",
-        "table_number",
+    list_filter: tuple[Any, ...] = (
+        OrderIdFilter,
+        TableNumberFilter,
         "status",
     )
     search_fields: tuple[str, ...] = ("table_number",)
+    search_help_text = "Номер стола, диапазон столов (1-10) или статус."
     readonly_fields: tuple[str, ...] = ("total_price",)
+    show_full_result_count = False
     inlines = [OrderItemInline]
 
+    def get_search_results(
+        self,
+        request: HttpRequest,
+        queryset: QuerySet[Order],
+        search_term: str,
+    ) -> Tuple[QuerySet[Order], bool]:
+        """
+        Поиск точным совпадением номера стола или статуса.
+        """
+        return search_orders(queryset, search_term), False
+
     def total_price(self, obj: Order) -> Any:
         """
         Метод для отображения общей суммы заказа.
@@ -58,6 +140,7 @@ class OrderAdmin(admin.ModelAdmin):
         return obj.total_price()
 
     total_price.short_description = "Сумма заказа"
+    total_price.admin_order_field = "total_amount"
 
 
 @admin.register(OrderItem)
@@ -72,3 +155,10 @@ class OrderItemAdmin(admin.ModelAdmin):
         "dish",
         "quantity",
     )
+    list_select_related: tuple[str, ...] = (
+        "order",
+        "dish",
+    )
+    raw_id_fields: tuple[str, ...] = ("order",)
+    autocomplete_fields: tuple[str, ...] = ("dish",)
+    show_full_result_count = False
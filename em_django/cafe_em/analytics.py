@@ -0,0 +1,134 @@
+import datetime
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Optional
+
+from django.db import models
+from django.db.models import Avg, Count, F, QuerySet, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import (
+    MENU_VERSION,
+    REVENUE_VERSION,
+    Order,
+    OrderItem,
+    items_total,
+)
+from .versioning import get_or_compute, get_version
+
+AMOUNT = models.DecimalField(max_digits=14, decimal_places=2)
+
+TOP_DISHES_ORDERING: Dict[str, str] = {
+    "revenue": "revenue",
+    "quantity": "quantity_sold",
+}
+
+
+def paid_orders(
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> QuerySet[Order]:
+    """
+    Оплаченные заказы, оплаченные с date_from по date_to включительно.
+    """
+    orders = Order.objects.filter(status=Order.Status.PAID)
+    if date_from is not None:
+        orders = orders.filter(paid_at__gte=_day_start(date_from))
+    if date_to is not None:
+        orders = orders.filter(
+            paid_at__lt=_day_start(date_to + datetime.timedelta(days=1)),
+        )
+    return orders
+
+
+def _day_start(day: datetime.date) -> datetime.datetime:
+    return timezone.make_aware(
+        datetime.datetime.combine(day, datetime.time.min),
+    )
+
+
+def top_dishes(
+    limit: int = 10,
+    order_by: str = "revenue",
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Самые продаваемые блюда оплаченных заказов по выручке
+    или количеству: один GROUP BY по позициям с ценами блюд.
+    revenue - выручка по текущим ценам блюд: позиции не хранят
+    цену на момент оплаты, поэтому после смены цены она расходится
+    с суммами оплаченных заказов в table_revenue()
+    и average_order_value().
+    """
+    items = OrderItem.objects.filter(
+        order__in=paid_orders(date_from, date_to),
+    )
+    return list(
+        items.values("dish", name=F("dish__name"))
+        .annotate(quantity_sold=Sum("quantity"), revenue=items_total())
+        .order_by(f"-{TOP_DISHES_ORDERING[order_by]}", "dish")[:limit]
+    )
+
+
+def table_revenue(
+    limit: int = 10,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Столы с наибольшей выручкой оплаченных заказов.
+    """
+    return list(
+        paid_orders(date_from, date_to)
+        .values("table_number")
+        .annotate(
+            revenue=Sum("total_amount"),
+            orders_count=Count("pk"),
+        )
+        .order_by("-revenue", "table_number")[:limit]
+    )
+
+
+def average_order_value(
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> Dict[str, Any]:
+    """
+    Число оплаченных заказов, их выручка и средний чек.
+    """
+    return paid_orders(date_from, date_to).aggregate(
+        orders_count=Count("pk"),
+        revenue=Coalesce(
+            Sum("total_amount"),
+            Value(Decimal("0.00")),
+            output_field=AMOUNT,
+        ),
+        average=Coalesce(
+            Avg("total_amount"),
+            Value(Decimal("0.00")),
+            output_field=AMOUNT,
+        ),
+    )
+
+
+def cached_report(
+    name: str,
+    report: Callable[..., Any],
+    **params: Any,
+) -> Any:
+    """
+    Отчёт report(**params) из общего кеша. Ключ содержит параметры
+    и версии выручки и меню, поэтому оплата заказа, изменение
+    оплаченного заказа или блюда дают новый ключ.
+    """
+    key: str = ":".join(
+        [
+            "cafe_em:analytics",
+            name,
+            str(get_version(REVENUE_VERSION)),
+            str(get_version(MENU_VERSION)),
+            *(f"{param}={params[param]}" for param in sorted(params)),
+        ]
+    )
+    return get_or_compute(key, lambda: report(**params))
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+
+from django.db import transaction
+
+# Сколько последних событий хранится для продолжения потока
+# по Last-Event-ID.
+EVENT_HISTORY: int = 1000
+
+
+class Event:
+    """
+    Событие заказа с порядковым номером.
+    """
+
+    def __init__(self, event_id: int, event_type: str, data: Dict[str, Any]):
+        self.id = event_id
+        self.type = event_type
+        self.data = data
+
+
+class EventBus:
+    """
+    Шина событий в памяти процесса.
+    Хранит последние EVENT_HISTORY событий и будит асинхронных
+    подписчиков из любого потока. События других процессов
+    она не видит: для нескольких процессов нужна общая шина
+    с тем же интерфейсом.
+    """
+
+    def __init__(self, history: int = EVENT_HISTORY) -> None:
+        self._lock = threading.Lock()
+        self._events: Deque[Event] = deque(maxlen=history)
+        self._last_id: int = 0
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = (
+            set()
+        )
+
+    @property
+    def last_id(self) -> int:
+        return self._last_id
+
+    def publish(self, event_type: str, data: Dict[str, Any]) -> Event:
+        """
+        Добавляет событие и будит подписчиков.
+        """
+        with self._lock:
+            self._last_id += 1
+            event = Event(self._last_id, event_type, data)
+            self._events.append(event)
+            waiters = list(self._waiters)
+        for loop, wakeup in waiters:
+            try:
+                loop.call_soon_threadsafe(wakeup.set)
+            except RuntimeError:
+                # Цикл подписчика уже закрыт.
+                pass
+        return event
+
+    def since(self, last_id: int) -> Optional[List[Event]]:
+        """
+        События после last_id или None, если часть из них
+        уже вытеснена из истории или last_id из другого запуска.
+        """
+        with self._lock:
+            if last_id > self._last_id:
+                return None
+            if self._events and last_id < self._events[0].id - 1:
+                return None
+            return [event for event in self._events if event.id > last_id]
+
+    async def wait(
+        self,
+        last_id: int,
+        timeout: float,
+    ) -> Optional[List[Event]]:
+        """
+        Ждёт события после last_id не дольше timeout секунд.
+        Возвращает пустой список, если событий не было,
+        и None, как since(), если продолжить поток нельзя.
+        """
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._lock:
+            self._waiters.add(waiter)
+        try:
+            events = self.since(last_id)
+            if events == []:
+                try:
+                    await asyncio.wait_for(waiter[1].wait(), timeout)
+                except asyncio.TimeoutError:
+                    pass
+                events = self.since(last_id)
+            return events
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+bus = EventBus()
+
+
+def publish_on_commit(event_type: str, data: Dict[str, Any]) -> None:
+    """
+    Публикует событие после коммита текущей транзакции,
+    чтобы подписчики не увидели откатившиеся изменения.
+    """
+    transaction.on_commit(lambda: bus.publish(event_type, data))
+
+
+def publish_batch_on_commit(
+    event_type: str,
+    items: List[Dict[str, Any]],
+) -> None:
+    """
+    Публикует событие event_type для каждого элемента items
+    одним обработчиком после коммита.
+    """
+    if not items:
+        return
+
+    def publish() -> None:
+        for data in items:
+            bus.publish(event_type, data)
+
+    transaction.on_commit(publish)
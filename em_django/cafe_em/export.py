@@ -0,0 +1,132 @@
+import csv
+import json
+from typing import Any, Dict, Iterator, List, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import QuerySet
+
+from .models import Order
+
+EXPORT_FORMATS: Dict[str, str] = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+CSV_COLUMNS: List[str] = [
+    "order_id",
+    "table_number",
+    "status",
+    "total_amount",
+    "dish_id",
+    "dish_name",
+    "dish_price",
+    "quantity",
+]
+
+
+class _EchoBuffer:
+    """
+    Буфер для csv.writer, который сразу отдаёт записанную строку.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def orders_for_export(
+    status: Optional[str] = None,
+    id_min: Optional[int] = None,
+    id_max: Optional[int] = None,
+) -> QuerySet[Order]:
+    """
+    Заказы для выгрузки с позициями и блюдами, по возрастанию id.
+    """
+    orders = Order.objects.with_items().order_by("id")
+    if status:
+        orders = orders.filter(status=status)
+    if id_min is not None:
+        orders = orders.filter(id__gte=id_min)
+    if id_max is not None:
+        orders = orders.filter(id__lte=id_max)
+    return orders
+
+
+def iter_order_records(
+    orders: QuerySet[Order],
+    chunk_size: int = 2000,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Отдаёт заказы по одному, читая их из БД пачками по chunk_size.
+    """
+    for order in orders.iterator(chunk_size=chunk_size):
+        yield {
+            "id": order.id,
+            "table_number": order.table_number,
+            "status": order.status,
+            "total_amount": order.total_amount,
+            "order_items": [
+                {
+                    "dish": item.dish_id,
+                    "dish_name": item.dish.name,
+                    "price": item.dish.price,
+                    "quantity": item.quantity,
+                }
+                for item in order.order_items.all()
+            ],
+        }
+
+
+def iter_ndjson(
+    orders: QuerySet[Order],
+    chunk_size: int = 2000,
+) -> Iterator[str]:
+    """
+    Выгрузка в NDJSON: один заказ с позициями на строку.
+    """
+    for record in iter_order_records(orders, chunk_size):
+        yield json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False)
+        yield "\n"
+
+
+def iter_csv(
+    orders: QuerySet[Order],
+    chunk_size: int = 2000,
+) -> Iterator[str]:
+    """
+    Выгрузка в CSV: одна позиция заказа на строку.
+    Заказ без позиций выгружается одной строкой с пустыми полями блюда.
+    """
+    writer = csv.writer(_EchoBuffer())
+    yield writer.writerow(CSV_COLUMNS)
+    for record in iter_order_records(orders, chunk_size):
+        order_columns = [
+            record["id"],
+            record["table_number"],
+            record["status"],
+            record["total_amount"],
+        ]
+        if not record["order_items"]:
+            yield writer.writerow(order_columns + ["", "", "", ""])
+        for item in record["order_items"]:
+            yield writer.writerow(
+                order_columns
+                + [
+                    item["dish"],
+                    item["dish_name"],
+                    item["price"],
+                    item["quantity"],
+                ]
+            )
+
+
+def iter_export(
+    export_format: str,
+    orders: QuerySet[Order],
+    chunk_size: int = 2000,
+) -> Iterator[str]:
+    """
+    Выгрузка заказов в формате export_format (ndjson или csv).
+    """
+    if export_format == "csv":
+        return iter_csv(orders, chunk_size)
+    return iter_ndjson(orders, chunk_size)
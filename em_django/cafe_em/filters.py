@@ -0,0 +1,93 @@
+import re
+from typing import Dict, Optional
+
+from django.db.models import Q, QuerySet
+from rest_framework.filters import SearchFilter
+from rest_framework.request import Request
+
+from .models import MAX_INTEGER, Order
+
+# Словарь для перевода строки из запроса в статус заказа:
+# принимает и значения статусов, и их русские названия.
+STATUS_TRANSLATION: Dict[str, str] = {
+    **{value: value for value in Order.Status.values},
+    **{
+        str(label).lower(): value
+        for value, label in Order.Status.choices
+    },
+}
+
+NUMBER_RANGE_RE = re.compile(r"^(\d+)\s*-\s*(\d+)$")
+
+
+def number_range_condition(field: str, query: str) -> Optional[Q]:
+    """
+    Условие на числовое поле: "a" - точное значение, "a-b" - диапазон.
+    Границы диапазона больше MAX_INTEGER не передаются в БД:
+    верхняя урезается, а диапазон целиком выше него пуст.
+    Возвращает None, если запрос не число и не диапазон.
+    """
+    query = query.strip()
+    # isdecimal(), а не isdigit(): isdigit() пропускает символы
+    # вроде "²", на которых int() падает.
+    if query.isdecimal():
+        return Q(**{field: int(query)})
+    number_range = NUMBER_RANGE_RE.match(query)
+    if number_range:
+        low, high = sorted(int(number) for number in number_range.groups())
+        if low > MAX_INTEGER:
+            return Q(pk__in=[])
+        return Q(**{f"{field}__range": (low, min(high, MAX_INTEGER))})
+    return None
+
+
+def order_search_condition(query: str) -> Optional[Q]:
+    """
+    Условие поиска заказов, которое может использовать индексы:
+    число - точный номер стола, "a-b" - диапазон номеров столов,
+    значение или название статуса - точный статус.
+    Возвращает None, если запрос ни под что не подходит.
+    """
+    query = query.strip().lower()
+    table_condition: Optional[Q] = number_range_condition(
+        "table_number",
+        query,
+    )
+    if table_condition is not None:
+        return table_condition
+    status: Optional[str] = STATUS_TRANSLATION.get(query)
+    if status:
+        return Q(status=status)
+    return None
+
+
+def search_orders(
+    queryset: QuerySet[Order],
+    query: Optional[str],
+) -> QuerySet[Order]:
+    """
+    Фильтрует заказы по поисковому запросу.
+    """
+    if not query or not query.strip():
+        return queryset
+    condition: Optional[Q] = order_search_condition(query)
+    if condition is None:
+        return queryset.none()
+    return queryset.filter(condition)
+
+
+class OrderSearchFilter(SearchFilter):
+    """
+    Поиск заказов по номеру стола и статусу без LIKE по всей таблице.
+    """
+
+    def filter_queryset(
+        self,
+        request: Request,
+        queryset: QuerySet[Order],
+        view,
+    ) -> QuerySet[Order]:
+        return search_orders(
+            queryset,
+            request.query_params.get(self.search_param),
+        )
@@ -1,8 +1,36 @@
+from decimal import Decimal
+from typing import Any, Optional
+
 from django import forms
-from .models import Dish, Order, OrderItem
+from django.db import models
+from django.forms.utils import flatatt
+from django.utils.html import format_html
+from django.utils.safestring import SafeString, mark_safe
+
+from .menu import menu
+from .models import Dish, Order, OrderItem, check_order_total
 
+DISH_EMPTY_LABEL: str = "---------"
 
-class OrderCreateForm(forms.ModelForm):
+
+class ValidatedModelForm(forms.ModelForm):
+    """
+    ModelForm, который сохраняет экземпляр без повторного full_clean():
+    форма уже проверила его в is_valid().
+    """
+
+    def save(self, commit: bool = True) -> models.Model:
+        if self.errors:
+            return super().save(commit)
+        if commit:
+            self.instance.save(validated=True)
+            self._save_m2m()
+        else:
+            self.save_m2m = self._save_m2m
+        return self.instance
+
+
+class OrderCreateForm(ValidatedModelForm):
     """
     Форма для создания заказа, включает только номер стола.
     """
@@ -21,11 +49,74 @@ class OrderCreateForm(forms.ModelForm):
         return table_number
 
 
-class OrderItemForm(forms.ModelForm):
+class MenuDishSelect(forms.Select):
+    """
+    Выпадающий список блюд из готового HTML меню.
+    Варианты не строятся заново для каждой формы:
+    выбранное блюдо отмечается в общем HTML.
+    """
+
+    options_html: Optional[str] = None
+
+    def render(
+        self,
+        name: str,
+        value: Any,
+        attrs: Optional[dict] = None,
+        renderer: Any = None,
+    ) -> SafeString:
+        options: str = self.options_html
+        if options is None:
+            options = menu.options_html(DISH_EMPTY_LABEL)
+        if value not in (None, ""):
+            options = options.replace(
+                format_html('<option value="{}">', value),
+                format_html('<option value="{}" selected>', value),
+                1,
+            )
+        return format_html(
+            '<select name="{}"{}>{}</select>',
+            name,
+            flatatt(self.build_attrs(self.attrs, attrs)),
+            mark_safe(options),
+        )
+
+
+class MenuDishChoiceField(forms.ModelChoiceField):
+    """
+    Поле выбора блюда, которое берёт блюда из кеша меню.
+    """
+
+    widget = MenuDishSelect
+
+    def __init__(self, **kwargs: Any) -> None:
+        kwargs.setdefault("empty_label", DISH_EMPTY_LABEL)
+        super().__init__(queryset=Dish.objects.all(), **kwargs)
+
+    def to_python(self, value: Any) -> Optional[Dish]:
+        if value in self.empty_values:
+            return None
+        try:
+            dish: Optional[Dish] = menu.get(int(value))
+        except (TypeError, ValueError):
+            dish = None
+        if dish is None:
+            raise forms.ValidationError(
+                self.error_messages["invalid_choice"],
+                code="invalid_choice",
+                params={"value": value},
+            )
+        return dish
+
+
+class OrderItemForm(ValidatedModelForm):
     """
     Форма для создания и редактирования позиций заказа.
+    dish_options - общий для всех форм набора HTML списка блюд.
     """
 
+    dish = MenuDishChoiceField(label="Блюдо")
+
     class Meta:
         model = OrderItem
         fields = [
@@ -33,17 +124,74 @@ class OrderItemForm(forms.ModelForm):
             "quantity",
         ]
 
+    def __init__(
+        self,
+        *args: Any,
+        dish_options: Optional[str] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        if dish_options is not None:
+            self.fields["dish"].widget.options_html = dish_options
+
+
+class OrderTotalFormSet(forms.BaseInlineFormSet):
+    """
+    Набор форм позиций заказа, который проверяет, что сумма
+    всех позиций помещается в Order.total_amount.
+    Выбранные блюда перечитываются из БД одним запросом:
+    сумма заказа считается и сохраняется по текущим ценам,
+    а не по кешу меню, который в процессе может отставать.
+    """
+
+    def clean(self) -> None:
+        super().clean()
+        forms_with_dish = [
+            form
+            for form in self.forms
+            if not self._should_delete_form(form)
+            and getattr(form, "cleaned_data", {}).get("dish")
+        ]
+        dishes = Dish.objects.in_bulk(
+            {form.cleaned_data["dish"].pk for form in forms_with_dish}
+        )
+        total: Decimal = Decimal("0.00")
+        for form in forms_with_dish:
+            dish: Optional[Dish] = dishes.get(form.cleaned_data["dish"].pk)
+            if dish is None:
+                form.add_error("dish", "Блюдо не найдено.")
+                continue
+            form.cleaned_data["dish"] = form.instance.dish = dish
+            total += dish.price * (form.cleaned_data.get("quantity") or 0)
+        check_order_total(total)
+
+
+class BaseOrderItemFormSet(OrderTotalFormSet):
+    """
+    Набор форм позиций заказа.
+    Список блюд берётся из меню один раз на запрос
+    и передаётся во все формы набора.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self.form_kwargs = {
+            **self.form_kwargs,
+            "dish_options": menu.options_html(DISH_EMPTY_LABEL),
+        }
+
 
 OrderItemFormSet = forms.inlineformset_factory(
     Order,
     OrderItem,
     form=OrderItemForm,
+    formset=BaseOrderItemFormSet,
     extra=4,
     can_delete=False,
 )
 
 
-class OrderUpdateForm(forms.ModelForm):
+class OrderUpdateForm(ValidatedModelForm):
     """
     Форма для обновления заказа.
     """
@@ -55,7 +203,7 @@ class OrderUpdateForm(forms.ModelForm):
         ]
 
 
-class DishForm(forms.ModelForm):
+class DishForm(ValidatedModelForm):
     """
     Форма для создания и редактирования блюд.
     """
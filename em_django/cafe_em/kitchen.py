@@ -0,0 +1,61 @@
+from typing import Any, Dict, List
+
+from .models import KITCHEN_VERSION, MENU_VERSION, Order, OrderItem
+from .versioning import get_or_compute, get_version
+
+
+def kitchen_etag() -> str:
+    """
+    ETag очереди кухни по версиям ожидающих заказов и меню.
+    Считается без запросов к БД.
+    """
+    return f'"{get_version(KITCHEN_VERSION)}-{get_version(MENU_VERSION)}"'
+
+
+def kitchen_queue() -> Dict[str, Any]:
+    """
+    Очередь кухни из общего кеша для текущего ETag.
+    """
+    etag: str = kitchen_etag()
+    return get_or_compute(
+        f"cafe_em:kitchen:{etag}",
+        build_kitchen_queue,
+    )
+
+
+def build_kitchen_queue() -> Dict[str, Any]:
+    """
+    Блюда всех ожидающих заказов одним запросом по позициям:
+    общее количество по блюдам и разбивка по заказам.
+    """
+    rows = (
+        OrderItem.objects.filter(order__status=Order.Status.WAITING)
+        .values_list(
+            "order_id",
+            "order__table_number",
+            "dish_id",
+            "dish__name",
+            "quantity",
+        )
+        .order_by("order_id", "dish_id")
+    )
+    dishes: Dict[int, Dict[str, Any]] = {}
+    orders: Dict[int, Dict[str, Any]] = {}
+    for order_id, table_number, dish_id, dish_name, quantity in rows:
+        dish = dishes.setdefault(
+            dish_id,
+            {"dish": dish_id, "name": dish_name, "quantity": 0},
+        )
+        dish["quantity"] += quantity
+        order = orders.setdefault(
+            order_id,
+            {"id": order_id, "table_number": table_number, "items": []},
+        )
+        order["items"].append(
+            {"dish": dish_id, "name": dish_name, "quantity": quantity},
+        )
+    totals: List[Dict[str, Any]] = sorted(
+        dishes.values(),
+        key=lambda dish: (-dish["quantity"], dish["dish"]),
+    )
+    return {"dishes": totals, "orders": list(orders.values())}
@@ -0,0 +1,66 @@
+from typing import Any, Dict, List
+
+from django.db.models import QuerySet
+
+from .models import Dish, Order, OrderItem
+
+# Поля строк списков. Порядок ключей ответа тот же,
+# что у OrderSerializer и DishSerializer.
+ORDER_LIST_FIELDS = ("id", "table_number", "status", "total_amount")
+DISH_LIST_FIELDS = ("id", "name", "price")
+
+
+def order_rows(orders: QuerySet[Order]) -> QuerySet:
+    """
+    Заказы как словари полей для order_list_data().
+    Курсорная пагинация работает и с такими строками.
+    """
+    return orders.values(*ORDER_LIST_FIELDS)
+
+
+def dish_rows(dishes: QuerySet[Dish]) -> QuerySet:
+    """
+    Блюда как словари полей для dish_list_data().
+    """
+    return dishes.values(*DISH_LIST_FIELDS)
+
+
+def order_list_data(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Данные списка заказов в формате OrderSerializer без его
+    полей: позиции всех заказов читаются одним values_list().
+    Позиции идут по блюдам, в порядке индекса unique_order_dish,
+    по которому их читает и prefetch_related("order_items").
+    total_price, как и в OrderSerializer, остаётся Decimal.
+    """
+    items: Dict[int, List[Dict[str, int]]] = {row["id"]: [] for row in rows}
+    if items:
+        for order_id, item_id, dish_id, quantity in (
+            OrderItem.objects.filter(order_id__in=items)
+            .order_by("order_id", "dish_id")
+            .values_list("order_id", "id", "dish_id", "quantity")
+        ):
+            items[order_id].append(
+                {"id": item_id, "dish": dish_id, "quantity": quantity}
+            )
+    return [
+        {
+            "id": row["id"],
+            "table_number": row["table_number"],
+            "status": row["status"],
+            "total_price": row["total_amount"],
+            "order_items": items[row["id"]],
+        }
+        for row in rows
+    ]
+
+
+def dish_list_data(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Данные списка блюд в формате DishSerializer: цена - строка
+    с двумя знаками после запятой, как у DecimalField.
+    """
+    return [
+        {"id": row["id"], "name": row["name"], "price": f"{row['price']:f}"}
+        for row in rows
+    ]
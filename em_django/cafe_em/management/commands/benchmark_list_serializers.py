@@ -0,0 +1,110 @@
+import time
+from decimal import Decimal
+from typing import Any, Callable, Dict, List
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import transaction
+from rest_framework.renderers import JSONRenderer
+
+from cafe_em.listing import (
+    dish_list_data,
+    dish_rows,
+    order_list_data,
+    order_rows,
+)
+from cafe_em.models import Dish, Order, OrderItem
+from cafe_em.serializers import DishSerializer, OrderSerializer
+
+
+class Command(BaseCommand):
+    """
+    Сравнивает скорость сериализаторов и быстрого чтения списков
+    (cafe_em.listing) на странице заказов и странице блюд.
+    Падает, если ответы различаются. Все изменения откатываются.
+    """
+
+    help = "Замеряет списки заказов и блюд: сериализаторы против values()."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--rows", type=int, default=500)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        rows: int = options["rows"]
+        repeat: int = options["repeat"]
+        with transaction.atomic():
+            self._seed(rows)
+            orders = Order.objects.order_by("-id")[:rows]
+            dishes = Dish.objects.order_by("-id")[:rows]
+            cases: Dict[str, Dict[str, Callable[[], List[Any]]]] = {
+                "orders": {
+                    "serializer": lambda: OrderSerializer(
+                        orders.prefetch_related("order_items"),
+                        many=True,
+                    ).data,
+                    "values": lambda: order_list_data(
+                        list(order_rows(orders))
+                    ),
+                },
+                "dishes": {
+                    "serializer": lambda: DishSerializer(
+                        dishes,
+                        many=True,
+                    ).data,
+                    "values": lambda: dish_list_data(list(dish_rows(dishes))),
+                },
+            }
+            for name, paths in cases.items():
+                rendered = {
+                    path: JSONRenderer().render(build())
+                    for path, build in paths.items()
+                }
+                if rendered["serializer"] != rendered["values"]:
+                    raise CommandError(f"Ответы списка {name} различаются.")
+                timings = {
+                    path: self._measure(build, repeat)
+                    for path, build in paths.items()
+                }
+                speedup: float = timings["serializer"] / timings["values"]
+                self.stdout.write(
+                    f"{name}: serializer {timings['serializer']:.2f} мс, "
+                    f"values {timings['values']:.2f} мс, "
+                    f"ускорение x{speedup:.1f}"
+                )
+            transaction.set_rollback(True)
+
+    def _seed(self, rows: int) -> None:
+        """
+        Создаёт блюда и заказы с тремя позициями.
+        """
+        dishes = Dish.objects.bulk_create(
+            Dish(name=f"Блюдо {number}", price=Decimal(number % 50) / 4)
+            for number in range(rows)
+        )
+        orders = Order.objects.bulk_create(
+            Order(table_number=100000 + number) for number in range(rows)
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(
+                order=order,
+                dish=dishes[(number + shift) % len(dishes)],
+                quantity=shift + 1,
+            )
+            for number, order in enumerate(orders)
+            for shift in range(3)
+        )
+        Order.objects.filter(
+            pk__in=[order.pk for order in orders],
+        ).refresh_totals()
+
+    @staticmethod
+    def _measure(build: Callable[[], List[Any]], repeat: int) -> float:
+        """
+        Лучшее время построения списка из repeat попыток, в мс.
+        """
+        best: float = float("inf")
+        for _ in range(repeat):
+            started: float = time.perf_counter()
+            build()
+            best = min(best, time.perf_counter() - started)
+        return best * 1000
@@ -0,0 +1,166 @@
+import re
+from decimal import Decimal
+from typing import Any, Callable, Dict, List, Tuple
+
+from django.core.management.base import BaseCommand, CommandError, CommandParser
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from cafe_em.models import Dish, Order, OrderItem
+
+# Любое чтение таблицы подряд, в том числе по индексу
+# ("SCAN t USING COVERING INDEX i"), кроме SCAN CONSTANT ROW.
+FULL_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(?!CONSTANT ROW\b)(\w+)")
+
+
+class Command(BaseCommand):
+    """
+    Заполняет БД тестовыми данными, выполняет горячие запросы представлений
+    и проверяет их планы через EXPLAIN QUERY PLAN.
+    Падает, если хотя бы один запрос читает таблицу целиком.
+    Все изменения откатываются.
+    """
+
+    help = "Проверяет планы запросов горячих представлений (SQLite)."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument("--orders", type=int, default=2000)
+        parser.add_argument("--dishes", type=int, default=100)
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        if connection.vendor != "sqlite":
+            raise CommandError("Команда поддерживает только SQLite.")
+
+        failures: List[Tuple[str, str, List[str]]] = []
+        with transaction.atomic():
+            order = self._seed(options["orders"], options["dishes"])
+            with override_settings(ALLOWED_HOSTS=["testserver"]):
+                for name, request in self._hot_paths(order).items():
+                    for sql, plan in self._explain(request):
+                        scans = self._full_scans(sql, plan)
+                        if scans:
+                            failures.append((name, sql, plan))
+                        self.stdout.write(f"{name}: {sql}")
+                        for line in plan:
+                            self.stdout.write(f"    {line}")
+            transaction.set_rollback(True)
+
+        if failures:
+            names = ", ".join(sorted({name for name, _, _ in failures}))
+            raise CommandError(f"Полное чтение таблицы в запросах: {names}")
+        self.stdout.write(self.style.SUCCESS("Полных чтений таблиц нет."))
+
+    def _seed(self, orders_count: int, dishes_count: int) -> Order:
+        """
+        Создаёт блюда и заказы с позициями во всех статусах.
+        """
+        dishes = Dish.objects.bulk_create(
+            Dish(name=f"Блюдо {number}", price=Decimal(number % 50 + 1))
+            for number in range(dishes_count)
+        )
+        statuses = Order.Status.values
+        orders = Order.objects.bulk_create(
+            Order(
+                table_number=100000 + number,
+                status=statuses[number % len(statuses)],
+            )
+            for number in range(orders_count)
+        )
+        OrderItem.objects.bulk_create(
+            OrderItem(
+                order=order,
+                dish=dishes[(number + shift) % len(dishes)],
+                quantity=shift + 1,
+            )
+            for number, order in enumerate(orders)
+            for shift in range(3)
+        )
+        Order.objects.filter(
+            pk__in=[order.pk for order in orders],
+        ).refresh_totals()
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        return orders[len(orders) // 2]
+
+    def _hot_paths(self, order: Order) -> Dict[str, Callable[[Client], Any]]:
+        """
+        Запросы к представлениям, планы которых проверяются.
+        """
+        orders_url = reverse("cafe_em:order-list")
+
+        def next_page(client: Client) -> Any:
+            first_page = client.get(orders_url).json()
+            return client.get(first_page["next"])
+
+        return {
+            "api:order-list-next-page": next_page,
+            "api:order-detail": lambda client: client.get(
+                reverse("cafe_em:order-detail", kwargs={"pk": order.pk})
+            ),
+            "api:order-filter-by-status": lambda client: client.get(
+                reverse(
+                    "cafe_em:order-filter-by-status",
+                    kwargs={"status": Order.Status.READY},
+                )
+            ),
+            "api:order-search-table": lambda client: client.get(
+                orders_url, {"search": str(order.table_number)}
+            ),
+            "api:order-search-range": lambda client: client.get(
+                orders_url, {"search": "100010-100020"}
+            ),
+            "api:order-search-status": lambda client: client.get(
+                orders_url, {"search": "оплачено"}
+            ),
+            "api:order-total-sum": lambda client: client.get(
+                reverse("cafe_em:order-total-sum")
+            ),
+            "api:dish-list": lambda client: client.get(
+                reverse("cafe_em:dish-list")
+            ),
+            "web:order-list": lambda client: client.get(
+                reverse("cafe_em:order_list")
+            ),
+            "web:order-detail": lambda client: client.get(
+                reverse("cafe_em:order_detail", kwargs={"pk": order.pk})
+            ),
+            "web:total-sum": lambda client: client.get(
+                reverse("cafe_em:total_sum")
+            ),
+        }
+
+    def _explain(
+        self,
+        request: Callable[[Client], Any],
+    ) -> List[Tuple[str, List[str]]]:
+        """
+        Выполняет запрос к представлению и возвращает план
+        каждого SELECT, который оно сделало.
+        """
+        with CaptureQueriesContext(connection) as queries:
+            request(Client())
+        plans: List[Tuple[str, List[str]]] = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                sql: str = query["sql"]
+                if not sql.lstrip().upper().startswith("SELECT"):
+                    continue
+                cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                plans.append((sql, [row[-1] for row in cursor.fetchall()]))
+        return plans
+
+    def _full_scans(self, sql: str, plan: List[str]) -> List[str]:
+        """
+        Строки плана с чтением таблицы целиком, в том числе по индексу.
+        Проход по индексу с LIMIT без WHERE и без сортировки
+        читает только LIMIT строк и полным чтением не считается.
+        """
+        scans = [line for line in plan if FULL_SCAN_RE.search(line.strip())]
+        bounded_walk = (
+            " LIMIT " in sql
+            and " WHERE " not in sql
+            and not any("TEMP B-TREE" in line for line in plan)
+        )
+        return [] if bounded_walk else scans
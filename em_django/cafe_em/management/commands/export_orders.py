@@ -0,0 +1,53 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+
+from cafe_em.export import EXPORT_FORMATS, iter_export, orders_for_export
+from cafe_em.models import Order
+
+
+class Command(BaseCommand):
+    """
+    Потоковая выгрузка заказов с позициями и суммами в NDJSON или CSV.
+    """
+
+    help = "Выгружает заказы с позициями в NDJSON или CSV."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--format",
+            dest="export_format",
+            choices=list(EXPORT_FORMATS),
+            default="ndjson",
+        )
+        parser.add_argument(
+            "--status",
+            choices=Order.Status.values,
+        )
+        parser.add_argument("--id-min", type=int)
+        parser.add_argument("--id-max", type=int)
+        parser.add_argument("--chunk-size", type=int, default=2000)
+        parser.add_argument(
+            "--output",
+            help="Файл для выгрузки, по умолчанию stdout.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        orders = orders_for_export(
+            status=options["status"],
+            id_min=options["id_min"],
+            id_max=options["id_max"],
+        )
+        chunks = iter_export(
+            options["export_format"],
+            orders,
+            options["chunk_size"],
+        )
+        if options["output"]:
+            with open(
+                options["output"], "w", encoding="utf-8", newline=""
+            ) as output:
+                output.writelines(chunks)
+        else:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
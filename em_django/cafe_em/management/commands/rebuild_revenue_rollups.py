@@ -0,0 +1,18 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from cafe_em.models import RevenueRollup
+
+
+class Command(BaseCommand):
+    """
+    Заново строит почасовую выручку по оплаченным заказам
+    одним группирующим запросом и вставляет её пачками.
+    """
+
+    help = "Перестраивает RevenueRollup по оплаченным заказам."
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        created: int = RevenueRollup.objects.rebuild()
+        self.stdout.write(self.style.SUCCESS(f"Строк выручки: {created}"))
@@ -0,0 +1,44 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from django.db import transaction
+
+from cafe_em.models import Order
+
+
+class Command(BaseCommand):
+    """
+    Находит заказы, у которых total_amount разошёлся с позициями,
+    и исправляет их одним UPDATE.
+    """
+
+    help = "Сверяет Order.total_amount с позициями заказов и исправляет."
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            "--include-paid",
+            action="store_true",
+            help="Проверять и оплаченные заказы.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать расхождения, ничего не меняя.",
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        orders = Order.objects.all()
+        if not options["include_paid"]:
+            orders = orders.open()
+
+        with transaction.atomic():
+            if options["dry_run"]:
+                drifted = orders.drifted().count()
+            else:
+                drifted = orders.drifted().refresh_totals()
+
+        if options["dry_run"]:
+            message = f"Расхождений найдено: {drifted}"
+        else:
+            message = f"Исправлено заказов: {drifted}"
+        self.stdout.write(self.style.SUCCESS(message))
@@ -0,0 +1,114 @@
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.utils.html import format_html, format_html_join
+
+from .models import MAX_INTEGER, MENU_VERSION, Dish
+from .versioning import get_version
+
+
+class _MenuSnapshot:
+    """
+    Каталог блюд одной версии меню и построенные по нему данные.
+    """
+
+    def __init__(self, version: Optional[int], dishes: Dict[int, Dish]):
+        self.version = version
+        self.dishes = dishes
+        self.derived: Dict[str, Any] = {}
+
+
+class MenuCache:
+    """
+    Каталог блюд в памяти процесса.
+    Весь каталог загружается одним запросом и перечитывается,
+    когда меняется общая версия меню (Dish.save()/delete()).
+    Массовые изменения блюд в обход модели должны вызывать
+    invalidate_menu() из models.
+    Возвращаемые экземпляры Dish общие для всех запросов
+    и должны использоваться только для чтения. Версия меню живёт
+    в кеше процесса (LocMemCache), поэтому суммы заказов считаются
+    не по ценам отсюда, а по БД (models.dish_prices()).
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._snapshot = _MenuSnapshot(None, {})
+
+    def _current(self) -> _MenuSnapshot:
+        version: int = get_version(MENU_VERSION)
+        if version != self._snapshot.version:
+            with self._lock:
+                if version != self._snapshot.version:
+                    self._snapshot = _MenuSnapshot(
+                        version,
+                        Dish.objects.in_bulk(),
+                    )
+        return self._snapshot
+
+    def get(self, dish_id: int) -> Optional[Dish]:
+        """
+        Блюдо по id или None, если такого блюда нет.
+        """
+        return self.in_bulk([dish_id]).get(dish_id)
+
+    def in_bulk(self, dish_ids: Iterable[int]) -> Dict[int, Dish]:
+        """
+        Блюда по списку id. Id, которых нет в каталоге,
+        проверяются в БД одним запросом. Id вне диапазона
+        столбца (1..MAX_INTEGER) не ищутся: таких блюд нет.
+        """
+        catalog: Dict[int, Dish] = self._current().dishes
+        dishes: Dict[int, Dish] = {}
+        missing = set()
+        for dish_id in dish_ids:
+            dish = catalog.get(dish_id)
+            if dish is None:
+                if 1 <= dish_id <= MAX_INTEGER:
+                    missing.add(dish_id)
+            else:
+                dishes[dish_id] = dish
+        if missing:
+            dishes.update(Dish.objects.in_bulk(missing))
+        return dishes
+
+    def choices(self) -> List[Tuple[int, str]]:
+        """
+        Варианты выбора блюда (id, название) для форм.
+        Строятся один раз на версию меню.
+        """
+        return self._choices(self._current())
+
+    def options_html(self, empty_label: Optional[str] = None) -> str:
+        """
+        Готовый HTML тегов <option> со всеми блюдами.
+        Рендерится один раз на версию меню.
+        """
+        snapshot: _MenuSnapshot = self._current()
+        key: str = f"options_html:{empty_label or ''}"
+        html: Optional[str] = snapshot.derived.get(key)
+        if html is None:
+            html = format_html_join(
+                "",
+                '<option value="{}">{}</option>',
+                self._choices(snapshot),
+            )
+            if empty_label is not None:
+                html = format_html(
+                    '<option value="">{}</option>{}',
+                    empty_label,
+                    html,
+                )
+            snapshot.derived[key] = html
+        return html
+
+    @staticmethod
+    def _choices(snapshot: _MenuSnapshot) -> List[Tuple[int, str]]:
+        choices = snapshot.derived.get("choices")
+        if choices is None:
+            choices = [(dish.pk, str(dish)) for dish in snapshot.dishes.values()]
+            snapshot.derived["choices"] = choices
+        return choices
+
+
+menu = MenuCache()
@@ -0,0 +1,55 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:33
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_total_amount(apps, schema_editor):
+    """
+    Заполняет total_amount суммой позиций существующих заказов.
+    """
+    Order = apps.get_model("cafe_em", "Order")
+    OrderItem = apps.get_model("cafe_em", "OrderItem")
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    totals = (
+        OrderItem.objects.filter(order=OuterRef("pk"))
+        .values("order")
+        .annotate(
+            total=Sum(F("quantity") * F("dish__price"), output_field=amount),
+        )
+        .values("total")
+    )
+    Order.objects.update(
+        total_amount=Coalesce(
+            Subquery(totals, output_field=amount),
+            Value(Decimal("0.00")),
+            output_field=amount,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cafe_em", "0009_alter_orderitem_dish_alter_orderitem_order"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="order",
+            name="total_amount",
+            field=models.DecimalField(
+                decimal_places=2,
+                default=Decimal("0.00"),
+                editable=False,
+                max_digits=12,
+                verbose_name="Сумма заказа",
+            ),
+        ),
+        migrations.RunPython(
+            fill_total_amount,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cafe_em", "0010_order_total_amount"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(fields=["status", "id"], name="order_status_id_idx"),
+        ),
+    ]
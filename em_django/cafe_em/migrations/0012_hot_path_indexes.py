@@ -0,0 +1,26 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cafe_em", "0011_order_status_id_idx"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["status", "total_amount"], name="order_status_total_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="orderitem",
+            index=models.Index(
+                fields=["order", "dish", "quantity"],
+                name="orderitem_order_dish_qty_idx",
+            ),
+        ),
+    ]
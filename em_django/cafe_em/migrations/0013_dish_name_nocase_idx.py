@@ -0,0 +1,35 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:44
+
+from django.db import migrations
+
+
+def create_name_index(apps, schema_editor):
+    """
+    Создаёт индекс по названию блюда с NOCASE. Collate "NOCASE"
+    есть только в SQLite, и только в SQLite istartswith (LIKE)
+    использует такой индекс, поэтому на других БД индекса нет.
+    """
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute(
+            'CREATE INDEX IF NOT EXISTS "dish_name_nocase_idx" '
+            'ON "cafe_em_dish" ("name" COLLATE NOCASE)'
+        )
+
+
+def drop_name_index(apps, schema_editor):
+    """
+    Удаляет индекс, созданный create_name_index().
+    """
+    if schema_editor.connection.vendor == "sqlite":
+        schema_editor.execute('DROP INDEX IF EXISTS "dish_name_nocase_idx"')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cafe_em", "0012_hot_path_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_name_index, drop_name_index),
+    ]
@@ -0,0 +1,115 @@
+# Generated by Django 5.1.6 on 2026-10-18 09:48
+
+import django.core.validators
+import django.utils.timezone
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, F, Sum
+from django.db.models.functions import ExtractHour, TruncDate
+
+
+def fill_paid_at(apps, schema_editor):
+    """
+    Отмечает время оплаты существующих оплаченных заказов
+    временем миграции и строит по ним почасовую выручку.
+    """
+    Order = apps.get_model("cafe_em", "Order")
+    RevenueRollup = apps.get_model("cafe_em", "RevenueRollup")
+    paid = Order.objects.filter(status="paid")
+    paid.update(paid_at=F("created_at"))
+    rows = (
+        paid.annotate(day=TruncDate("paid_at"), hour=ExtractHour("paid_at"))
+        .values("day", "hour")
+        .annotate(revenue=Sum("total_amount"), orders_count=Count("pk"))
+        .order_by()
+    )
+    RevenueRollup.objects.bulk_create(RevenueRollup(**row) for row in rows)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cafe_em", "0013_dish_name_nocase_idx"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="RevenueRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(verbose_name="День")),
+                (
+                    "hour",
+                    models.PositiveSmallIntegerField(
+                        validators=[django.core.validators.MaxValueValidator(23)],
+                        verbose_name="Час",
+                    ),
+                ),
+                (
+                    "revenue",
+                    models.DecimalField(
+                        decimal_places=2,
+                        default=Decimal("0.00"),
+                        max_digits=14,
+                        verbose_name="Выручка",
+                    ),
+                ),
+                (
+                    "orders_count",
+                    models.PositiveIntegerField(
+                        default=0, verbose_name="Оплаченных заказов"
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Revenue Rollup",
+            },
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="created_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now, editable=False, verbose_name="Создан"
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="paid_at",
+            field=models.DateTimeField(
+                blank=True, editable=False, null=True, verbose_name="Оплачен"
+            ),
+        ),
+        migrations.AddField(
+            model_name="order",
+            name="status_changed_at",
+            field=models.DateTimeField(
+                default=django.utils.timezone.now,
+                editable=False,
+                verbose_name="Статус изменён",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["status", "paid_at"], name="order_status_paid_at_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="revenuerollup",
+            constraint=models.UniqueConstraint(
+                fields=("day", "hour"), name="unique_revenue_rollup_hour"
+            ),
+        ),
+        migrations.RunPython(
+            fill_paid_at,
+            migrations.RunPython.noop,
+        ),
+    ]
@@ -1,8 +1,102 @@
-from typing import Any
+import datetime
+import re
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
 
-from django.db import models
-from django.core.validators import MinValueValidator
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import (
+    Coalesce,
+    ExtractHour,
+    TruncDate,
+)
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.forms import ValidationError
+from django.utils import timezone
+
+from .events import bus, publish_on_commit
+from .versioning import invalidate
+
+MENU_VERSION: str = "menu"
+REVENUE_VERSION: str = "revenue"
+KITCHEN_VERSION: str = "kitchen"
+
+# Наибольшее значение целочисленных столбцов и id (64-битное целое
+# со знаком). Большие числа из запросов не должны доходить до БД.
+MAX_INTEGER: int = 2**63 - 1
+
+
+def invalidate_menu() -> None:
+    """
+    Сбрасывает кеш меню во всех процессах.
+    """
+    invalidate(MENU_VERSION)
+
+
+def invalidate_revenue() -> None:
+    """
+    Сбрасывает кеш суммы оплаченных заказов во всех процессах.
+    """
+    invalidate(REVENUE_VERSION)
+
+
+def invalidate_kitchen() -> None:
+    """
+    Сбрасывает кеш очереди кухни (ожидающих заказов) во всех процессах.
+    """
+    invalidate(KITCHEN_VERSION)
+
+
+def unique_violation(
+    instance: models.Model,
+    error: IntegrityError,
+) -> ValidationError:
+    """
+    Ошибка валидации по нарушению ограничения уникальности в БД
+    с тем же сообщением, что дал бы full_clean().
+    Ограничение узнаётся по именам столбцов в тексте ошибки.
+    """
+    words = set(re.findall(r"\w+", str(error)))
+    opts = instance._meta
+    checks: List[Tuple[str, ...]] = [
+        (field.name,)
+        for field in opts.concrete_fields
+        if field.unique and not field.primary_key
+    ]
+    checks += [
+        tuple(constraint.fields)
+        for constraint in opts.constraints
+        if isinstance(constraint, models.UniqueConstraint) and constraint.fields
+    ]
+    for fields in checks:
+        if all(opts.get_field(name).column in words for name in fields):
+            key: str = fields[0] if len(fields) == 1 else NON_FIELD_ERRORS
+            return ValidationError(
+                {key: [instance.unique_error_message(type(instance), fields)]}
+            )
+    return ValidationError(str(error))
+
+
+def save_row(
+    instance: models.Model,
+    save: Callable[..., None],
+    validated: bool,
+    *args: Any,
+    **kwargs: Any,
+) -> None:
+    """
+    Вызывает save() модели. Для уже проверенного экземпляра
+    (validated=True) целостность обеспечивают ограничения БД,
+    а их нарушение превращается в ValidationError.
+    """
+    if not validated:
+        save(*args, **kwargs)
+        return
+    try:
+        save(*args, **kwargs)
+    except IntegrityError as error:
+        raise unique_violation(instance, error) from error
 
 
 class Dish(models.Model):
@@ -12,6 +106,10 @@ class Dish(models.Model):
 
     class Meta:
         verbose_name = "Dish"
+        # Индекс для поиска по началу названия без учёта регистра
+        # (dish_name_nocase_idx) создаёт миграция 0013 только в SQLite:
+        # istartswith там - LIKE, который использует лишь индекс
+        # с NOCASE, а Collate "NOCASE" на других БД нет.
 
     name: str = models.CharField(
         max_length=255,
@@ -23,21 +121,238 @@ class Dish(models.Model):
         verbose_name="Цена",
     )
 
+    @classmethod
+    def from_db(cls, db, field_names, values) -> "Dish":
+        instance = super().from_db(db, field_names, values)
+        instance._saved_price = instance.__dict__.get("price")
+        return instance
+
     def clean(self):
         if self.price < 0:
             raise ValidationError("Цена не может быть отрицательной")
-    
-    def save(self, *args, **kwargs):
+
+    def save(self, *args, validated: bool = False, **kwargs):
         """
         Проверка корректности данных перед сохранением.
+        validated=True - данные уже проверили форма или сериализатор,
+        full_clean() не вызывается.
+        Новая цена пересчитывает суммы неоплаченных заказов с этим блюдом.
+        Сохранение сбрасывает кеш меню.
         """
-        self.full_clean()
-        super().save(*args, **kwargs)
+        if not validated:
+            self.full_clean()
+        price_changed: bool = not self._state.adding and self.price != getattr(
+            self, "_saved_price", None
+        )
+        with transaction.atomic():
+            save_row(self, super().save, validated, *args, **kwargs)
+            if price_changed:
+                Order.objects.open().filter(
+                    order_items__dish=self,
+                ).refresh_totals()
+            invalidate_menu()
+        self._saved_price = self.price
+
+    def delete(self, *args, **kwargs):
+        """
+        Удаляет блюдо и пересчитывает суммы заказов, в которых оно было.
+        """
+        with transaction.atomic():
+            order_ids = list(
+                self.ordered_in.values_list("order_id", flat=True),
+            )
+            result = super().delete(*args, **kwargs)
+            Order.objects.filter(pk__in=order_ids).refresh_totals()
+            invalidate_menu()
+        return result
 
     def __str__(self) -> str:
         return self.name
 
 
+def items_total(prefix: str = "") -> Coalesce:
+    """
+    Выражение SUM(quantity * dish.price) по позициям заказа.
+    prefix - путь до позиций заказа, например "order_items__".
+    """
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    return Coalesce(
+        Sum(
+            F(f"{prefix}quantity") * F(f"{prefix}dish__price"),
+            output_field=amount,
+        ),
+        Value(Decimal("0.00")),
+        output_field=amount,
+    )
+
+
+def publish_orders_on_commit(
+    event_type: str,
+    order_ids: Iterable[int],
+    **extra: Any,
+) -> None:
+    """
+    Публикует event_type для заказов order_ids после коммита
+    с теми же полями, что у событий Order.save(): номер стола
+    и статус читаются одним запросом уже после коммита.
+    """
+    order_ids = set(order_ids)
+    if not order_ids:
+        return
+
+    def publish() -> None:
+        for data in (
+            Order.objects.filter(pk__in=order_ids)
+            .order_by("pk")
+            .values("id", "table_number", "status")
+        ):
+            bus.publish(event_type, {**data, **extra})
+
+    transaction.on_commit(publish)
+
+
+class OrderQuerySet(models.QuerySet):
+    """
+    QuerySet заказов с выборками для списков и API.
+    """
+
+    def open(self) -> "OrderQuerySet":
+        """
+        Неоплаченные заказы.
+        """
+        return self.exclude(status=Order.Status.PAID)
+
+    def with_items(self) -> "OrderQuerySet":
+        """
+        Предзагружает позиции заказа вместе с блюдами.
+        """
+        return self.prefetch_related(
+            models.Prefetch(
+                "order_items",
+                queryset=OrderItem.objects.select_related("dish"),
+            )
+        )
+
+    def with_computed_totals(self) -> "OrderQuerySet":
+        """
+        Добавляет сумму заказа, посчитанную по позициям (computed_total).
+        """
+        return self.annotate(computed_total=self._computed_total())
+
+    def drifted(self) -> "OrderQuerySet":
+        """
+        Заказы, у которых сохранённая сумма не совпадает с позициями.
+        """
+        return self.with_computed_totals().exclude(
+            total_amount=F("computed_total"),
+        )
+
+    def paid_total(self) -> Decimal:
+        """
+        Общая сумма оплаченных заказов.
+        """
+        return self.filter(status=Order.Status.PAID).aggregate(
+            total=Coalesce(
+                Sum("total_amount"),
+                Value(Decimal("0.00")),
+                output_field=models.DecimalField(
+                    max_digits=14,
+                    decimal_places=2,
+                ),
+            )
+        )["total"]
+
+    def transition(
+        self,
+        order_ids: Iterable[int],
+        status: str,
+        from_status: Optional[str] = None,
+    ) -> List[int]:
+        """
+        Переводит заказы order_ids в status одним условным UPDATE:
+        меняются только заказы в статусе from_status или, если он
+        не задан, в любом статусе, из которого переход разрешён.
+        Возвращает id изменённых заказов. Кеши, выручка и события
+        обновляются один раз на весь вызов.
+        """
+        order_ids = list(order_ids)
+        sources: List[str] = (
+            [from_status]
+            if from_status is not None
+            else Order.Status(status).sources()
+        )
+        if not order_ids or not sources:
+            return []
+        now: datetime.datetime = timezone.now()
+        with transaction.atomic(savepoint=False):
+            updated: int = self.filter(
+                pk__in=order_ids,
+                status__in=sources,
+            ).update(
+                status=status,
+                status_changed_at=now,
+                paid_at=now if status == Order.Status.PAID else None,
+            )
+            if updated == len(order_ids):
+                changed: List[int] = order_ids
+            elif updated:
+                # Изменённые этим UPDATE заказы - те, у которых
+                # время смены статуса совпадает с now.
+                changed = list(
+                    self.filter(
+                        pk__in=order_ids,
+                        status=status,
+                        status_changed_at=now,
+                    ).values_list("pk", flat=True)
+                )
+            else:
+                return []
+            if status == Order.Status.PAID:
+                RevenueRollup.objects.refresh([now])
+        if Order.Status.PAID in (status, *sources):
+            invalidate_revenue()
+        if Order.Status.WAITING in (status, *sources):
+            invalidate_kitchen()
+        previous_status: Optional[str] = (
+            sources[0] if len(sources) == 1 else None
+        )
+        publish_orders_on_commit(
+            "order.status_changed",
+            changed,
+            status=status,
+            previous_status=previous_status,
+        )
+        return changed
+
+    def refresh_totals(self) -> int:
+        """
+        Пересчитывает total_amount одним UPDATE по позициям заказов.
+        Используется после массовых операций с позициями,
+        которые не вызывают OrderItem.save()/delete().
+        """
+        updated: int = self.update(total_amount=self._computed_total())
+        if updated:
+            if RevenueRollup.objects.refresh_for_orders(self):
+                invalidate_revenue()
+            invalidate_kitchen()
+        return updated
+
+    @staticmethod
+    def _computed_total() -> Coalesce:
+        totals = (
+            OrderItem.objects.filter(order=OuterRef("pk"))
+            .values("order")
+            .annotate(total=items_total())
+            .values("total")
+        )
+        amount = models.DecimalField(max_digits=12, decimal_places=2)
+        return Coalesce(
+            Subquery(totals, output_field=amount),
+            Value(Decimal("0.00")),
+            output_field=amount,
+        )
+
+
 class Order(models.Model):
     """
     Модель заказа
@@ -48,8 +363,38 @@ class Order(models.Model):
         READY = "ready", "Готово"
         PAID = "paid", "Оплачено"
 
+        def can_transition_to(self, status: str) -> bool:
+            """
+            Разрешён ли переход из этого статуса в status.
+            """
+            return status in ORDER_STATUS_TRANSITIONS[self]
+
+        def sources(self) -> List[str]:
+            """
+            Статусы, из которых разрешён переход в этот статус.
+            """
+            return [
+                source
+                for source, targets in ORDER_STATUS_TRANSITIONS.items()
+                if self in targets
+            ]
+
     class Meta:
         verbose_name = "Order"
+        indexes = [
+            models.Index(
+                fields=["status", "id"],
+                name="order_status_id_idx",
+            ),
+            models.Index(
+                fields=["status", "total_amount"],
+                name="order_status_total_idx",
+            ),
+            models.Index(
+                fields=["status", "paid_at"],
+                name="order_status_paid_at_idx",
+            ),
+        ]
 
     table_number: int = models.PositiveIntegerField(
         verbose_name="Номер стола",
@@ -62,20 +407,50 @@ class Order(models.Model):
         default=Status.WAITING,
         verbose_name="Статус заказа",
     )
+    total_amount: Decimal = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        editable=False,
+        verbose_name="Сумма заказа",
+    )
+    created_at: datetime.datetime = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        verbose_name="Создан",
+    )
+    status_changed_at: datetime.datetime = models.DateTimeField(
+        default=timezone.now,
+        editable=False,
+        verbose_name="Статус изменён",
+    )
+    paid_at: Optional[datetime.datetime] = models.DateTimeField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name="Оплачен",
+    )
     items = models.ManyToManyField(
         Dish,
         through="OrderItem",
         verbose_name="Заказанные блюда",
     )
 
-    def total_price(self) -> float:
+    objects = OrderQuerySet.as_manager()
+
+    @classmethod
+    def from_db(cls, db, field_names, values) -> "Order":
+        instance = super().from_db(db, field_names, values)
+        instance._saved_status = instance.__dict__.get("status")
+        instance._saved_table_number = instance.__dict__.get("table_number")
+        instance._saved_paid_at = instance.__dict__.get("paid_at")
+        return instance
+
+    def total_price(self) -> Decimal:
         """
         Общая стоимость заказа.
         """
-        return sum(
-            item.dish.price * item.quantity
-            for item in self.order_items.prefetch_related("dish").all()
-        )
+        return self.total_amount
 
     def clean(self):
         """
@@ -84,17 +459,244 @@ class Order(models.Model):
         if self.status not in self.Status:
             raise ValidationError(f"Неверный статус: {self.status}")
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, validated: bool = False, **kwargs):
         """
         Проверка корректности данных перед сохранением.
+        validated=True - данные уже проверили форма или сериализатор:
+        full_clean() и его SELECT уникальности номера стола
+        не выполняются, дубликат отклоняет БД.
+        total_amount ведут позиции заказа, поэтому при обновлении
+        без явного update_fields он не перезаписывается.
+        Смена статуса запоминает время смены и время оплаты
+        и пересчитывает выручку за часы оплаты.
+        Оплаченный заказ или заказ, вышедший из оплаченных,
+        сбрасывает кеш суммы оплаченных заказов, а заказ, ставший
+        или переставший быть ожидающим, и ожидающий заказ с новым
+        номером стола - кеш очереди кухни.
+        После коммита публикуется событие заказа.
+        """
+        if not validated:
+            self.full_clean()
+        adding: bool = self._state.adding
+        saved_status: Optional[str] = getattr(self, "_saved_status", None)
+        table_changed: bool = self.table_number != getattr(
+            self, "_saved_table_number", None
+        )
+        status_changed: bool = adding or self.status != saved_status
+        saved_paid_at: Optional[datetime.datetime] = getattr(
+            self, "_saved_paid_at", None
+        )
+        if status_changed:
+            self._stamp_status()
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "status" in update_fields:
+            kwargs["update_fields"] = {
+                *update_fields,
+                "status_changed_at",
+                "paid_at",
+            }
+        if (
+            not self._state.adding
+            and update_fields is None
+            and not kwargs.get("force_insert")
+        ):
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "total_amount"
+            ]
+        with transaction.atomic(savepoint=False):
+            save_row(self, super().save, validated, *args, **kwargs)
+            if status_changed and self._affects_revenue():
+                RevenueRollup.objects.refresh([saved_paid_at, self.paid_at])
+        if self._affects_revenue():
+            invalidate_revenue()
+        if (status_changed or table_changed) and self._affects_kitchen():
+            invalidate_kitchen()
+        if adding:
+            self._publish("order.created")
+        elif status_changed:
+            self._publish("order.status_changed", previous_status=saved_status)
+        else:
+            self._publish("order.updated")
+        self._saved_status = self.status
+        self._saved_table_number = self.table_number
+        self._saved_paid_at = self.paid_at
+
+    def _stamp_status(self) -> None:
+        """
+        Время смены статуса и время оплаты для нового статуса.
+        Время оплаты, заданное у нового заказа явно, сохраняется.
         """
-        self.full_clean()
-        super().save(*args, **kwargs)
+        now: datetime.datetime = timezone.now()
+        if self._state.adding:
+            if self.status == self.Status.PAID and self.paid_at is None:
+                self.paid_at = now
+            return
+        self.status_changed_at = now
+        self.paid_at = now if self.status == self.Status.PAID else None
+
+    def delete(self, *args: Any, **kwargs: Any) -> Tuple[int, dict]:
+        """
+        Удаляет заказ. Удаление оплаченного заказа пересчитывает
+        выручку за час его оплаты и сбрасывает кеш суммы
+        оплаченных заказов, ожидающего - кеш очереди кухни.
+        После коммита публикуется событие удаления.
+        """
+        order_id: Optional[int] = self.pk
+        with transaction.atomic(savepoint=False):
+            result = super().delete(*args, **kwargs)
+            if self._affects_revenue():
+                RevenueRollup.objects.refresh(
+                    [self.paid_at, getattr(self, "_saved_paid_at", None)]
+                )
+        if self._affects_revenue():
+            invalidate_revenue()
+        if self._affects_kitchen():
+            invalidate_kitchen()
+        publish_on_commit(
+            "order.deleted",
+            {
+                "id": order_id,
+                "table_number": self.table_number,
+                "status": self.status,
+            },
+        )
+        return result
+
+    def _publish(self, event_type: str, **extra: Any) -> None:
+        publish_on_commit(
+            event_type,
+            {
+                "id": self.pk,
+                "table_number": self.table_number,
+                "status": self.status,
+                **extra,
+            },
+        )
+
+    def _affects_revenue(self) -> bool:
+        """
+        Заказ оплачен сейчас или был оплачен при загрузке из БД.
+        """
+        return self._had_status(self.Status.PAID)
+
+    def _affects_kitchen(self) -> bool:
+        """
+        Заказ ожидает сейчас или ожидал при загрузке из БД.
+        """
+        return self._had_status(self.Status.WAITING)
+
+    def _had_status(self, status: str) -> bool:
+        return status in (self.status, getattr(self, "_saved_status", None))
 
     def __str__(self) -> str:
         return f"Заказ {self.id} - Стол {self.table_number}"
 
 
+# Разрешённые переходы статусов заказа. Оплаченный заказ - конечный.
+ORDER_STATUS_TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    Order.Status.WAITING: (Order.Status.READY,),
+    Order.Status.READY: (Order.Status.WAITING, Order.Status.PAID),
+    Order.Status.PAID: (),
+}
+
+# Сумма заказа должна быть меньше этого значения,
+# чтобы поместиться в Order.total_amount.
+TOTAL_AMOUNT_LIMIT: Decimal = Decimal(10) ** (
+    Order._meta.get_field("total_amount").max_digits
+    - Order._meta.get_field("total_amount").decimal_places
+)
+TOTAL_AMOUNT_ERROR: str = (
+    f"Сумма заказа должна быть меньше {TOTAL_AMOUNT_LIMIT:f}."
+)
+
+
+def check_order_total(total: Decimal) -> None:
+    """
+    Сумма заказа, которая не помещается в Order.total_amount,
+    - ошибка валидации, а не ошибка при сохранении или чтении.
+    """
+    if total >= TOTAL_AMOUNT_LIMIT:
+        raise ValidationError(TOTAL_AMOUNT_ERROR, code="total_amount")
+
+
+def dish_prices(dish_ids: Iterable[int]) -> Dict[int, Decimal]:
+    """
+    Цены блюд из БД одним запросом. Суммы заказов для записи
+    считаются по ним, а не по кешу меню: кеш в памяти процесса
+    может отставать от изменений, сделанных другими процессами.
+    """
+    dish_ids = set(dish_ids)
+    if not dish_ids:
+        return {}
+    return dict(
+        Dish.objects.filter(pk__in=dish_ids).values_list("pk", "price")
+    )
+
+
+class OrderItemQuerySet(models.QuerySet):
+    """
+    QuerySet позиций заказа с атомарным изменением количества.
+    """
+
+    def increment(self, order_id: int, dish_id: int, amount: int = 1) -> bool:
+        """
+        Увеличивает количество блюда в заказе одним UPDATE с F(),
+        а если позиции ещё нет - создаёт её. Возвращает False
+        и ничего не меняет, если сумма заказа перестала бы
+        помещаться в total_amount: UPDATE заказа с этим условием
+        не находит строку.
+        """
+        delta = (
+            Subquery(Dish.objects.filter(pk=dish_id).values("price")[:1])
+            * amount
+        )
+        with transaction.atomic():
+            if not Order.objects.filter(
+                pk=order_id,
+                total_amount__lt=TOTAL_AMOUNT_LIMIT - delta,
+            ).update(total_amount=F("total_amount") + delta):
+                return False
+            line = self.filter(order_id=order_id, dish_id=dish_id)
+            if not line.update(quantity=F("quantity") + amount):
+                try:
+                    with transaction.atomic():
+                        self.bulk_create(
+                            [
+                                OrderItem(
+                                    order_id=order_id,
+                                    dish_id=dish_id,
+                                    quantity=amount,
+                                )
+                            ]
+                        )
+                except IntegrityError:
+                    # Позицию успел создать параллельный запрос.
+                    line.update(quantity=F("quantity") + amount)
+            Order.objects.filter(pk=order_id).refresh_totals()
+            publish_orders_on_commit("order.updated", [order_id])
+        return True
+
+    def decrement(self, order_id: int, dish_id: int, amount: int = 1) -> bool:
+        """
+        Уменьшает количество блюда в заказе одним UPDATE с F().
+        Позиция, количество которой дошло бы до нуля, удаляется.
+        Возвращает False, если позиции не было.
+        """
+        with transaction.atomic():
+            line = self.filter(order_id=order_id, dish_id=dish_id)
+            changed = line.filter(quantity__gt=amount).update(
+                quantity=F("quantity") - amount,
+            )
+            if not changed:
+                changed, _ = line.filter(quantity__lte=amount).delete()
+            if changed:
+                Order.objects.filter(pk=order_id).refresh_totals()
+                publish_orders_on_commit("order.updated", [order_id])
+        return bool(changed)
+
+
 class OrderItem(models.Model):
     """
     Модель связывающая заказ и блюдо.
@@ -118,8 +720,16 @@ class OrderItem(models.Model):
         validators=[MinValueValidator(1)],
     )
 
+    objects = OrderItemQuerySet.as_manager()
+
     class Meta:
         verbose_name = "Order Item"
+        indexes = [
+            models.Index(
+                fields=["order", "dish", "quantity"],
+                name="orderitem_order_dish_qty_idx",
+            ),
+        ]
         constraints = [
             models.UniqueConstraint(
                 fields=["order", "dish"],
@@ -127,12 +737,334 @@ class OrderItem(models.Model):
             )
         ]
 
-    def save(self, *args: Any, **kwargs: Any) -> None:
+    @classmethod
+    def from_db(cls, db, field_names, values) -> "OrderItem":
+        instance = super().from_db(db, field_names, values)
+        instance._remember_line()
+        return instance
+
+    def line_total(self) -> Decimal:
+        """
+        Стоимость позиции.
+        """
+        return self.dish.price * self.quantity
+
+    def clean(self):
+        """
+        Проверяет, что сумма заказа с этой позицией
+        помещается в Order.total_amount.
+        """
+        if self.order_id is None or self.dish_id is None or not self.quantity:
+            return
+        others: Decimal = (
+            OrderItem.objects.filter(order_id=self.order_id)
+            .exclude(pk=self.pk)
+            .aggregate(total=items_total())["total"]
+        )
+        check_order_total(others + self.line_total())
+
+    def save(
+        self,
+        *args: Any,
+        validated: bool = False,
+        **kwargs: Any,
+    ) -> None:
         """
         Проверка корректности данных перед сохранением.
+        validated=True - данные уже проверили форма или сериализатор:
+        full_clean() и его SELECT заказа, блюда и unique_order_dish
+        не выполняются, целостность обеспечивают ограничения БД.
+        Изменение стоимости позиции переносится в total_amount заказа
+        в той же транзакции, после коммита публикуется событие заказа.
+        Кеш кухни сбрасывается всегда: количество видно в очереди,
+        даже если стоимость позиции не изменилась.
+        """
+        if not validated:
+            self.full_clean()
+        with transaction.atomic():
+            saved_line = self._saved_line()
+            save_row(self, super().save, validated, *args, **kwargs)
+            if saved_line is not None:
+                order_id, saved_total = saved_line
+                self._add_to_order_total(order_id, -saved_total)
+                if order_id != self.order_id:
+                    publish_orders_on_commit("order.updated", [order_id])
+            self._add_to_order_total(self.order_id, self.line_total())
+            invalidate_kitchen()
+            publish_orders_on_commit("order.updated", [self.order_id])
+        self._remember_line()
+
+    def delete(self, *args: Any, **kwargs: Any) -> Tuple[int, dict]:
+        """
+        Удаляет позицию и вычитает её стоимость из суммы заказа.
         """
-        self.full_clean()
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            saved_line = self._saved_line()
+            result = super().delete(*args, **kwargs)
+            invalidate_kitchen()
+            if saved_line is not None:
+                order_id, saved_total = saved_line
+                self._add_to_order_total(order_id, -saved_total)
+                publish_orders_on_commit("order.updated", [order_id])
+        self._loaded_line = None
+        return result
+
+    def _remember_line(self) -> None:
+        """
+        Запоминает сохранённые в БД заказ, блюдо и количество.
+        """
+        self._loaded_line = (
+            self.__dict__.get("order_id"),
+            self.__dict__.get("dish_id"),
+            self.__dict__.get("quantity"),
+        )
+
+    def _saved_line(self) -> Optional[Tuple[int, Decimal]]:
+        """
+        Заказ и стоимость позиции в том виде, в каком она сохранена в БД.
+        """
+        if self._state.adding or self.pk is None:
+            return None
+        loaded_line = getattr(self, "_loaded_line", None)
+        if loaded_line is None or None in loaded_line:
+            saved = (
+                OrderItem.objects.filter(pk=self.pk)
+                .values_list("order_id", "quantity", "dish__price")
+                .first()
+            )
+            if saved is None:
+                return None
+            order_id, quantity, price = saved
+            return order_id, price * quantity
+        order_id, dish_id, quantity = loaded_line
+        if dish_id == self.dish_id:
+            price = self.dish.price
+        else:
+            price = Dish.objects.values_list("price", flat=True).get(
+                pk=dish_id,
+            )
+        return order_id, price * quantity
+
+    def _add_to_order_total(self, order_id: int, delta: Decimal) -> None:
+        """
+        Атомарно прибавляет delta к total_amount заказа.
+        Если сумма перестала бы помещаться в total_amount,
+        UPDATE не меняет строку и поднимается ValidationError.
+        Кеш суммы оплаченных заказов сбрасывается, только если
+        заказ оплачен: это видно по запросу, который пересчитывает
+        почасовую выручку. Кеш кухни сбрасывают save() и delete().
+        """
+        if not delta:
+            return
+        orders = Order.objects.filter(pk=order_id)
+        if delta > 0:
+            limited = orders.filter(
+                total_amount__lt=TOTAL_AMOUNT_LIMIT - delta,
+            )
+            if not limited.update(total_amount=F("total_amount") + delta):
+                raise ValidationError(
+                    TOTAL_AMOUNT_ERROR,
+                    code="total_amount",
+                )
+        else:
+            orders.update(total_amount=F("total_amount") + delta)
+        if RevenueRollup.objects.refresh_for_orders(orders):
+            invalidate_revenue()
+        if (
+            self._meta.get_field("order").is_cached(self)
+            and self.order.pk == order_id
+        ):
+            self.order.total_amount += delta
 
     def __str__(self) -> str:
         return f"{self.dish.name} - {self.quantity}шт"
+
+
+def revenue_bucket(moment: datetime.datetime) -> Tuple[datetime.date, int]:
+    """
+    День и час строки RevenueRollup для момента оплаты
+    (в текущем часовом поясе).
+    """
+    local: datetime.datetime = timezone.localtime(moment)
+    return local.date(), local.hour
+
+
+class RevenueRollupQuerySet(models.QuerySet):
+    """
+    QuerySet почасовой выручки.
+    """
+
+    def between(
+        self,
+        date_from: datetime.date,
+        date_to: datetime.date,
+    ) -> "RevenueRollupQuerySet":
+        """
+        Строки за дни с date_from по date_to включительно.
+        """
+        return self.filter(day__range=(date_from, date_to))
+
+    def totals(self) -> Dict[str, Any]:
+        """
+        Выручка и число оплаченных заказов по всем строкам.
+        """
+        return self.aggregate(
+            revenue=Coalesce(
+                Sum("revenue"),
+                Value(Decimal("0.00")),
+                output_field=models.DecimalField(
+                    max_digits=14,
+                    decimal_places=2,
+                ),
+            ),
+            orders_count=Coalesce(Sum("orders_count"), 0),
+        )
+
+    def by_day(self) -> "RevenueRollupQuerySet":
+        """
+        Выручка и число оплаченных заказов по дням.
+        """
+        return (
+            self.values("day")
+            .annotate(
+                revenue=Sum("revenue"),
+                orders_count=Sum("orders_count"),
+            )
+            .order_by("day")
+        )
+
+    def by_hour(self) -> "RevenueRollupQuerySet":
+        """
+        Выручка и число оплаченных заказов по часам.
+        """
+        return self.values("day", "hour", "revenue", "orders_count").order_by(
+            "day",
+            "hour",
+        )
+
+    def refresh(
+        self,
+        moments: Iterable[Optional[datetime.datetime]],
+    ) -> None:
+        """
+        Пересчитывает строки за часы, в которые попадают moments,
+        по оплаченным заказам этих часов. Строка часа блокируется
+        до пересчёта, поэтому параллельные оплаты в один час
+        пересчитывают её по очереди и не затирают друг друга.
+        """
+        buckets = sorted(
+            {revenue_bucket(moment) for moment in moments if moment is not None}
+        )
+        for day, hour in buckets:
+            start: datetime.datetime = timezone.make_aware(
+                datetime.datetime.combine(day, datetime.time(hour)),
+            )
+            with transaction.atomic(savepoint=False):
+                self._lock_bucket(day, hour)
+                totals: Dict[str, Any] = Order.objects.filter(
+                    status=Order.Status.PAID,
+                    paid_at__gte=start,
+                    paid_at__lt=start + datetime.timedelta(hours=1),
+                ).aggregate(
+                    revenue=Sum("total_amount"),
+                    orders_count=Count("pk"),
+                )
+                bucket = self.filter(day=day, hour=hour)
+                if totals["orders_count"]:
+                    bucket.update(**totals)
+                else:
+                    bucket.delete()
+
+    def _lock_bucket(self, day: datetime.date, hour: int) -> None:
+        """
+        Блокирует строку часа до конца транзакции (SELECT ... FOR UPDATE),
+        при необходимости создав её. Итоги часа считаются после
+        блокировки и видят оплаты, закоммиченные до неё.
+        """
+        bucket = self.select_for_update().filter(day=day, hour=hour)
+        if bucket.values_list("pk", flat=True):
+            return
+        try:
+            with transaction.atomic():
+                self.create(day=day, hour=hour)
+        except IntegrityError:
+            # Строку успел создать параллельный запрос: ждём его коммита.
+            list(bucket.values_list("pk", flat=True))
+
+    def refresh_for_orders(self, orders: OrderQuerySet) -> bool:
+        """
+        Пересчитывает строки за часы оплаты оплаченных заказов из orders.
+        Возвращает True, если среди orders есть оплаченные заказы.
+        """
+        moments: List[Optional[datetime.datetime]] = list(
+            orders.filter(status=Order.Status.PAID)
+            .values_list("paid_at", flat=True)
+            .order_by()
+            .distinct()
+        )
+        self.refresh(moments)
+        return bool(moments)
+
+    def rebuild(self) -> int:
+        """
+        Заново строит все строки по оплаченным заказам
+        одним группирующим запросом. Возвращает число строк.
+        """
+        rows = (
+            Order.objects.filter(
+                status=Order.Status.PAID,
+                paid_at__isnull=False,
+            )
+            .annotate(day=TruncDate("paid_at"), hour=ExtractHour("paid_at"))
+            .values("day", "hour")
+            .annotate(
+                revenue=Sum("total_amount"),
+                orders_count=Count("pk"),
+            )
+            .order_by()
+        )
+        with transaction.atomic():
+            RevenueRollup.objects.all().delete()
+            created = RevenueRollup.objects.bulk_create(
+                (RevenueRollup(**row) for row in rows.iterator()),
+                batch_size=1000,
+            )
+        return len(created)
+
+
+class RevenueRollup(models.Model):
+    """
+    Выручка оплаченных заказов за час.
+    Обновляется при оплате заказа и изменении оплаченных заказов,
+    полностью перестраивается командой rebuild_revenue_rollups.
+    """
+
+    day: datetime.date = models.DateField(verbose_name="День")
+    hour: int = models.PositiveSmallIntegerField(
+        verbose_name="Час",
+        validators=[MaxValueValidator(23)],
+    )
+    revenue: Decimal = models.DecimalField(
+        max_digits=14,
+        decimal_places=2,
+        default=Decimal("0.00"),
+        verbose_name="Выручка",
+    )
+    orders_count: int = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Оплаченных заказов",
+    )
+
+    objects = RevenueRollupQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Revenue Rollup"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["day", "hour"],
+                name="unique_revenue_rollup_hour",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.day} {self.hour:02d}:00 - {self.revenue}"
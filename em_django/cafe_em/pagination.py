@@ -0,0 +1,76 @@
+from typing import Any, List
+
+from django.core.paginator import EmptyPage, Page, PageNotAnInteger, Paginator
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Курсорная пагинация по убыванию id.
+    Следующая страница выбирается по условию на id,
+    без OFFSET и без COUNT(*), поэтому глубокие страницы не дороже первой.
+    """
+
+    ordering = "-id"
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 500
+
+
+class NoCountPage(Page):
+    """
+    Страница NoCountPaginator: есть ли следующая, известно
+    по лишней строке, прочитанной вместе со страницей.
+    """
+
+    def __init__(
+        self,
+        object_list: List[Any],
+        number: int,
+        paginator: Paginator,
+        has_next: bool,
+    ) -> None:
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self) -> bool:
+        return self._has_next
+
+
+class NoCountPaginator(Paginator):
+    """
+    Постраничный вывод страниц сайта без COUNT(*), который читает
+    таблицу целиком: страница читается с одной лишней строкой.
+    Число страниц не считается.
+    """
+
+    def validate_number(self, number: Any) -> int:
+        """
+        Номер страницы - целое число от 1, без проверки
+        на число страниц.
+        """
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise PageNotAnInteger("Номер страницы не целое число.")
+        if number < 1:
+            raise EmptyPage("Номер страницы меньше 1.")
+        return number
+
+    def page(self, number: Any) -> NoCountPage:
+        """
+        Страница number и признак следующей одним запросом с LIMIT.
+        """
+        number = self.validate_number(number)
+        bottom: int = (number - 1) * self.per_page
+        rows: List[Any] = list(
+            self.object_list[bottom : bottom + self.per_page + 1]
+        )
+        if not rows and number > 1:
+            raise EmptyPage("На этой странице нет результатов.")
+        return NoCountPage(
+            rows[: self.per_page],
+            number,
+            self,
+            has_next=len(rows) > self.per_page,
+        )
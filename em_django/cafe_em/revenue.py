@@ -0,0 +1,16 @@
+from decimal import Decimal
+
+from .models import REVENUE_VERSION, Order
+from .versioning import get_or_compute, get_version
+
+
+def paid_total() -> Decimal:
+    """
+    Общая сумма оплаченных заказов из общего кеша.
+    Сумма считается заново только после сброса версии REVENUE_VERSION,
+    и одновременно её считает один запрос.
+    """
+    return get_or_compute(
+        f"cafe_em:revenue:{get_version(REVENUE_VERSION)}",
+        Order.objects.paid_total,
+    )
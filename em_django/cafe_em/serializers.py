@@ -1,9 +1,104 @@
-from typing import Any, Dict, List, Optional
+import datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db import models, transaction
+from django.utils import timezone
 from rest_framework import serializers
-from .models import Dish, Order, OrderItem
+from .events import publish_batch_on_commit
+from .filters import search_orders
+from .menu import menu
+from .models import (
+    MAX_INTEGER,
+    Dish,
+    Order,
+    OrderItem,
+    RevenueRollup,
+    check_order_total,
+    dish_prices,
+    invalidate_kitchen,
+    invalidate_revenue,
+)
 
 
-class DishSerializer(serializers.ModelSerializer):
+def order_items_total(
+    items: List[Dict[str, Any]],
+    prices: Optional[Dict[int, Decimal]] = None,
+) -> Decimal:
+    """
+    Сумма позиций заказа по ценам блюд из БД (prices из dish_prices();
+    если не переданы, загружаются одним запросом).
+    Блюдо, которого уже нет в БД, и сумма, которая не помещается
+    в Order.total_amount, - ошибки валидации, а не ошибки при сохранении.
+    """
+    if prices is None:
+        prices = dish_prices(item["dish"].pk for item in items)
+    total: Decimal = Decimal("0.00")
+    for item in items:
+        price: Optional[Decimal] = prices.get(item["dish"].pk)
+        if price is None:
+            raise serializers.ValidationError(
+                f"Блюдо {item['dish'].pk} не найдено.",
+            )
+        total += price * item["quantity"]
+    try:
+        check_order_total(total)
+    except DjangoValidationError as error:
+        raise serializers.ValidationError(error.messages)
+    return total
+
+
+def validated_total(items: List[Dict[str, Any]]) -> Decimal:
+    """
+    order_items_total() для validate(): ошибки суммы
+    относятся к полю order_items.
+    """
+    try:
+        return order_items_total(items)
+    except serializers.ValidationError as exc:
+        raise serializers.ValidationError({"order_items": exc.detail})
+
+
+def save_validated(instance: models.Model) -> None:
+    """
+    Сохраняет экземпляр, уже проверенный сериализатором, без повторного
+    full_clean(). Нарушение ограничений БД возвращается как ошибка
+    валидации сериализатора; транзакцию, в которой оно случилось,
+    откатывает вызывающий код.
+    """
+    try:
+        instance.save(validated=True)
+    except DjangoValidationError as error:
+        raise serializers.ValidationError(
+            serializers.as_serializer_error(error),
+        )
+
+
+class ValidatedModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer, который сохраняет экземпляры через save_validated().
+    Подходит для моделей без many-to-many полей в fields.
+    """
+
+    def create(self, validated_data: Dict[str, Any]) -> models.Model:
+        instance: models.Model = self.Meta.model(**validated_data)
+        with transaction.atomic():
+            save_validated(instance)
+        return instance
+
+    def update(
+        self,
+        instance: models.Model,
+        validated_data: Dict[str, Any],
+    ) -> models.Model:
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+        with transaction.atomic():
+            save_validated(instance)
+        return instance
+
+
+class DishSerializer(ValidatedModelSerializer):
     """
     Сериализатор для модели Dish.
     Использует все поля модели.
@@ -24,12 +119,111 @@ class DishSerializer(serializers.ModelSerializer):
         return value
 
 
+class BulkRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Поле связи по первичному ключу, которое запоминает найденные объекты.
+    В списке BulkRelatedListSerializer объекты всех элементов
+    загружаются заранее одним in_bulk(), а не запросом на элемент.
+    """
+
+    def __init__(self, **kwargs: Any) -> None:
+        super().__init__(**kwargs)
+        self.resolved: Dict[Any, Optional[models.Model]] = {}
+
+    def in_bulk(self, pks: List[Any]) -> Dict[Any, models.Model]:
+        """
+        Объекты по списку первичных ключей одним запросом.
+        """
+        return self.get_queryset().in_bulk(pks)
+
+    def prefetch(self, values: Iterable[Any]) -> None:
+        """
+        Загружает объекты для ещё не известных ключей из values.
+        Ненайденные ключи запоминаются, чтобы не искать их снова.
+        """
+        pks: List[Any] = []
+        for value in values:
+            pk = self.to_pk(value)
+            if pk is not None and pk not in self.resolved:
+                self.resolved[pk] = None
+                pks.append(pk)
+        if pks:
+            self.resolved.update(self.in_bulk(pks))
+
+    def to_pk(self, data: Any) -> Optional[Any]:
+        """
+        Первичный ключ из входных данных или None, если он некорректен.
+        """
+        if isinstance(data, bool):
+            return None
+        try:
+            return self.get_queryset().model._meta.pk.to_python(data)
+        except (TypeError, ValueError, DjangoValidationError):
+            return None
+
+    def to_internal_value(self, data: Any) -> models.Model:
+        pk = self.to_pk(data)
+        if pk is None:
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        if pk not in self.resolved:
+            self.prefetch([pk])
+        instance: Optional[models.Model] = self.resolved[pk]
+        if instance is None:
+            self.fail("does_not_exist", pk_value=data)
+        return instance
+
+
+class BulkRelatedListSerializer(serializers.ListSerializer):
+    """
+    Список, который перед проверкой элементов загружает объекты
+    всех полей BulkRelatedField одним запросом на поле.
+    Ошибки ненайденных ключей остаются ошибками своих элементов.
+    """
+
+    def prefetch(self, data: Iterable[Any]) -> None:
+        """
+        Загружает связанные объекты для элементов data.
+        """
+        items: List[Mapping] = [
+            item for item in data if isinstance(item, Mapping)
+        ]
+        for field in self.child.fields.values():
+            if isinstance(field, BulkRelatedField) and not field.read_only:
+                field.prefetch(
+                    item[field.field_name]
+                    for item in items
+                    if field.field_name in item
+                )
+
+    def to_internal_value(self, data: Any) -> List[Dict[str, Any]]:
+        if isinstance(data, list):
+            self.prefetch(data)
+        return super().to_internal_value(data)
+
+
+class MenuDishField(BulkRelatedField):
+    """
+    Поле блюда по id, которое ищет блюда в кеше меню, а не в БД.
+    """
+
+    default_error_messages = {
+        "does_not_exist": "Блюдо {pk_value} не найдено.",
+    }
+
+    def __init__(self, **kwargs: Any) -> None:
+        kwargs.setdefault("queryset", Dish.objects.all())
+        super().__init__(**kwargs)
+
+    def in_bulk(self, pks: List[Any]) -> Dict[Any, Dish]:
+        return menu.in_bulk(pks)
+
+
 class OrderItemSerializer(serializers.ModelSerializer):
     """
     Сериализатор для модели OrderItem.
     """
 
-    dish = serializers.PrimaryKeyRelatedField(queryset=Dish.objects.all())
+    dish = MenuDishField()
 
     class Meta:
         model = OrderItem
@@ -38,11 +232,13 @@ class OrderItemSerializer(serializers.ModelSerializer):
             "dish",
             "quantity",
         ]
+        list_serializer_class = BulkRelatedListSerializer
 
 
-class OrderSerializer(serializers.ModelSerializer):
+class OrderSerializer(ValidatedModelSerializer):
     """
     Сериализатор для модели Order.
+    Уникальность номера стола проверяет БД при сохранении.
     """
 
     order_items = OrderItemSerializer(
@@ -59,15 +255,234 @@ class OrderSerializer(serializers.ModelSerializer):
             "total_price",
             "order_items",
         ]
+        extra_kwargs = {"table_number": {"validators": []}}
+
+
+class OrderItemCreateSerializer(serializers.Serializer):
+    """
+    Сериализатор позиции создаваемого заказа.
+    """
+
+    dish = MenuDishField()
+    quantity = serializers.IntegerField(
+        min_value=1,
+        max_value=MAX_INTEGER,
+        default=1,
+    )
+
+    class Meta:
+        list_serializer_class = BulkRelatedListSerializer
+
+
+class OrderItemQuantitySerializer(serializers.Serializer):
+    """
+    Сериализатор изменения количества блюда в заказе.
+    За один запрос количество меняется не больше чем на MAX_QUANTITY.
+    """
+
+    MAX_QUANTITY: int = 1000
+
+    quantity = serializers.IntegerField(
+        min_value=1,
+        max_value=MAX_QUANTITY,
+        default=1,
+    )
+
+
+class OrderStatusTransitionSerializer(serializers.Serializer):
+    """
+    Сериализатор смены статуса заказа.
+    from_status - статус, в котором заказ должен быть сейчас.
+    """
+
+    status = serializers.ChoiceField(choices=Order.Status.choices)
+    from_status = serializers.ChoiceField(
+        choices=Order.Status.choices,
+        required=False,
+    )
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        from_status = attrs.get("from_status")
+        if from_status is not None and not Order.Status(
+            from_status
+        ).can_transition_to(attrs["status"]):
+            raise serializers.ValidationError(
+                f"Переход из {from_status} в {attrs['status']} запрещён.",
+            )
+        return attrs
+
+
+class OrderBulkStatusFilterSerializer(serializers.Serializer):
+    """
+    Фильтр заказов для пакетной смены статуса.
+    search - как в поиске заказов: номер стола, диапазон или статус.
+    """
+
+    status = serializers.ChoiceField(
+        choices=Order.Status.choices,
+        required=False,
+    )
+    search = serializers.CharField(required=False)
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        if not attrs:
+            raise serializers.ValidationError("Фильтр не может быть пустым.")
+        return attrs
+
+
+class OrderBulkStatusSerializer(serializers.Serializer):
+    """
+    Сериализатор пакетной смены статуса заказов по списку id
+    или по фильтру. Переходы проверяются как у одного заказа,
+    статус меняется одним UPDATE, результат - по каждому заказу.
+    """
+
+    MAX_ORDERS: int = 1000
+
+    status = serializers.ChoiceField(choices=Order.Status.choices)
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1, max_value=MAX_INTEGER),
+        allow_empty=False,
+        max_length=MAX_ORDERS,
+        required=False,
+    )
+    filter = OrderBulkStatusFilterSerializer(required=False)
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        if ("ids" in attrs) == ("filter" in attrs):
+            raise serializers.ValidationError(
+                "Нужно передать либо ids, либо filter.",
+            )
+        return attrs
+
+    def _current_statuses(self) -> Dict[int, str]:
+        """
+        Текущие статусы выбранных заказов одним запросом.
+        """
+        if "ids" in self.validated_data:
+            orders = Order.objects.filter(pk__in=self.validated_data["ids"])
+        else:
+            filters: Dict[str, Any] = self.validated_data["filter"]
+            orders = Order.objects.order_by("pk")
+            if "status" in filters:
+                orders = orders.filter(status=filters["status"])
+            if "search" in filters:
+                orders = search_orders(orders, filters["search"])
+        statuses: Dict[int, str] = dict(
+            orders.values_list("pk", "status")[: self.MAX_ORDERS + 1]
+        )
+        if len(statuses) > self.MAX_ORDERS:
+            raise serializers.ValidationError(
+                {
+                    "filter": [
+                        f"Фильтр выбирает больше {self.MAX_ORDERS} заказов.",
+                    ]
+                }
+            )
+        return statuses
+
+    def create(self, validated_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """
+        Меняет статус разрешённых заказов и возвращает результат
+        по каждому: changed, not_found, rejected (переход запрещён)
+        или conflict (статус успел измениться).
+        """
+        target: str = validated_data["status"]
+        statuses: Dict[int, str] = self._current_statuses()
+        order_ids: List[int] = list(
+            dict.fromkeys(validated_data.get("ids", statuses)),
+        )
+        allowed: List[int] = [
+            order_id
+            for order_id in order_ids
+            if order_id in statuses
+            and Order.Status(statuses[order_id]).can_transition_to(target)
+        ]
+        changed = set(Order.objects.transition(allowed, target))
+        results: List[Dict[str, Any]] = []
+        for order_id in order_ids:
+            if order_id in changed:
+                outcome, current = "changed", target
+            elif order_id not in statuses:
+                outcome, current = "not_found", None
+            elif order_id in allowed:
+                outcome, current = "conflict", None
+            else:
+                outcome, current = "rejected", statuses[order_id]
+            results.append(
+                {"id": order_id, "outcome": outcome, "status": current},
+            )
+        return results
+
+
+class OrderExportFilterSerializer(serializers.Serializer):
+    """
+    Сериализатор параметров выгрузки заказов.
+    """
+
+    status = serializers.ChoiceField(
+        choices=Order.Status.choices,
+        required=False,
+    )
+    id_min = serializers.IntegerField(required=False)
+    id_max = serializers.IntegerField(required=False)
+
+
+class RevenueFilterSerializer(serializers.Serializer):
+    """
+    Параметры запроса выручки за период.
+    """
+
+    date_from = serializers.DateField()
+    date_to = serializers.DateField()
+    group = serializers.ChoiceField(
+        choices=["day", "hour"],
+        default="day",
+    )
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        if attrs["date_from"] > attrs["date_to"]:
+            raise serializers.ValidationError(
+                "date_from не может быть позже date_to.",
+            )
+        return attrs
+
+
+class AnalyticsFilterSerializer(serializers.Serializer):
+    """
+    Параметры отчётов по продажам.
+    """
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    limit = serializers.IntegerField(
+        min_value=1,
+        max_value=100,
+        default=10,
+    )
+    order_by = serializers.ChoiceField(
+        choices=["revenue", "quantity"],
+        default="revenue",
+    )
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        date_from = attrs.get("date_from")
+        date_to = attrs.get("date_to")
+        if date_from and date_to and date_from > date_to:
+            raise serializers.ValidationError(
+                "date_from не может быть позже date_to.",
+            )
+        return attrs
 
 
 class OrderCreateSerializer(serializers.ModelSerializer):
     """
     Сериализатор для создания заказа.
+    Уникальность номера стола проверяет БД при сохранении.
     """
 
-    order_items = serializers.ListField(
-        child=serializers.DictField(),
+    order_items = OrderItemCreateSerializer(
+        many=True,
         write_only=True,
     )
 
@@ -77,32 +492,227 @@ class OrderCreateSerializer(serializers.ModelSerializer):
             "table_number",
             "order_items",
         ]
+        extra_kwargs = {"table_number": {"validators": []}}
+
+    def validate_order_items(
+        self,
+        value: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Проверяет, что каждое блюдо указано в заказе один раз.
+        """
+        seen: set = set()
+        errors: List[Dict[str, List[str]]] = []
+        for item in value:
+            dish_id: int = item["dish"].pk
+            if dish_id in seen:
+                errors.append(
+                    {"dish": [f"Блюдо {dish_id} указано несколько раз."]}
+                )
+            else:
+                errors.append({})
+            seen.add(dish_id)
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return value
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Добавляет сумму заказа по ценам из БД.
+        """
+        attrs["total_amount"] = validated_total(attrs["order_items"])
+        return attrs
 
     def create(self, validated_data: Dict[str, Any]) -> Order:
         """
-        Создаёт экземпляр заказа вместе
+        Создаёт экземпляр заказа вместе с позициями в одной транзакции.
         """
         order_items_data: List[Dict[str, Any]] = validated_data.pop(
             "order_items",
             [],
         )
-        order: Order = Order.objects.create(**validated_data)
-
-        for item_data in order_items_data:
-            dish_id: int = item_data.pop("dish")
-            dish_instance: Dish = Dish.objects.get(id=dish_id)
-            OrderItem.objects.create(
-                order=order,
-                dish=dish_instance,
-                **item_data,
+        with transaction.atomic():
+            order: Order = Order(**validated_data)
+            save_validated(order)
+            OrderItem.objects.bulk_create(
+                OrderItem(order=order, **item_data)
+                for item_data in order_items_data
             )
 
         return order
 
 
+class OrderBulkRowSerializer(serializers.Serializer):
+    """
+    Сериализатор одного заказа из пакетной загрузки.
+    """
+
+    table_number = serializers.IntegerField(
+        min_value=0,
+        max_value=MAX_INTEGER,
+    )
+    status = serializers.ChoiceField(
+        choices=Order.Status.choices,
+        default=Order.Status.WAITING,
+    )
+    order_items = OrderItemCreateSerializer(many=True)
+
+
+class OrderBulkCreateSerializer(serializers.Serializer):
+    """
+    Сериализатор пакетной загрузки заказов.
+    Блюда всех заказов берутся из кеша меню одним in_bulk(),
+    их цены для сумм и занятые столы - одним запросом каждые.
+    Невалидные заказы не мешают сохранению остальных
+    и попадают в row_errors.
+    """
+
+    BATCH_SIZE: int = 500
+
+    orders = serializers.ListField(
+        child=serializers.DictField(),
+        allow_empty=False,
+    )
+
+    row_errors: List[Dict[str, Any]]
+
+    def validate_orders(
+        self,
+        value: List[Dict[str, Any]],
+    ) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        Возвращает пары (номер строки, данные) для валидных заказов.
+        """
+        row_serializer = OrderBulkRowSerializer()
+        row_serializer.fields["order_items"].prefetch(
+            item
+            for row in value
+            if isinstance(row.get("order_items"), list)
+            for item in row["order_items"]
+        )
+        errors: Dict[int, Any] = {}
+        rows: List[Tuple[int, Dict[str, Any]]] = []
+        for index, row in enumerate(value):
+            try:
+                rows.append((index, row_serializer.run_validation(row)))
+            except serializers.ValidationError as exc:
+                errors[index] = exc.detail
+
+        taken_tables = set(
+            Order.objects.filter(
+                table_number__in={row["table_number"] for _, row in rows},
+            ).values_list("table_number", flat=True)
+        )
+        prices: Dict[int, Decimal] = dish_prices(
+            item["dish"].pk for _, row in rows for item in row["order_items"]
+        )
+
+        valid_rows: List[Tuple[int, Dict[str, Any]]] = []
+        for index, row in rows:
+            row_errors = self._check_row(row, taken_tables, prices)
+            if row_errors:
+                errors[index] = row_errors
+                continue
+            taken_tables.add(row["table_number"])
+            valid_rows.append((index, row))
+
+        self.row_errors = [
+            {"index": index, "errors": errors[index]}
+            for index in sorted(errors)
+        ]
+        return valid_rows
+
+    def _check_row(
+        self,
+        row: Dict[str, Any],
+        taken_tables: set,
+        prices: Dict[int, Decimal],
+    ) -> Dict[str, Any]:
+        """
+        Проверяет заказ по уже загруженным занятым столам
+        и записывает в row сумму заказа по ценам prices.
+        """
+        errors: Dict[str, Any] = {}
+        if row["table_number"] in taken_tables:
+            errors["table_number"] = ["Номер стола уже занят."]
+        dish_ids: List[int] = [item["dish"].pk for item in row["order_items"]]
+        if len(set(dish_ids)) != len(dish_ids):
+            errors["order_items"] = [
+                "Блюдо не может быть указано в заказе несколько раз.",
+            ]
+        else:
+            try:
+                row["total_amount"] = order_items_total(
+                    row["order_items"],
+                    prices,
+                )
+            except serializers.ValidationError as exc:
+                errors["order_items"] = exc.detail
+        return errors
+
+    def create(self, validated_data: Dict[str, Any]) -> List[Order]:
+        """
+        Сохраняет валидные заказы и их позиции пачками bulk_create.
+        bulk_create не вызывает Order.save(), поэтому время оплаты,
+        почасовая выручка, сброс кешей и события создания заказов
+        обрабатываются здесь.
+        """
+        rows: List[Dict[str, Any]] = [
+            row for _, row in validated_data["orders"]
+        ]
+        now: datetime.datetime = timezone.now()
+        with transaction.atomic():
+            orders: List[Order] = Order.objects.bulk_create(
+                [
+                    Order(
+                        table_number=row["table_number"],
+                        status=row["status"],
+                        total_amount=row["total_amount"],
+                        created_at=now,
+                        status_changed_at=now,
+                        paid_at=(
+                            now if row["status"] == Order.Status.PAID else None
+                        ),
+                    )
+                    for row in rows
+                ],
+                batch_size=self.BATCH_SIZE,
+            )
+            OrderItem.objects.bulk_create(
+                [
+                    OrderItem(
+                        order_id=order.pk,
+                        dish=item["dish"],
+                        quantity=item["quantity"],
+                    )
+                    for order, row in zip(orders, rows)
+                    for item in row["order_items"]
+                ],
+                batch_size=self.BATCH_SIZE,
+            )
+            if any(order.status == Order.Status.PAID for order in orders):
+                RevenueRollup.objects.refresh([now])
+                invalidate_revenue()
+            if any(order.status == Order.Status.WAITING for order in orders):
+                invalidate_kitchen()
+            publish_batch_on_commit(
+                "order.created",
+                [
+                    {
+                        "id": order.pk,
+                        "table_number": order.table_number,
+                        "status": order.status,
+                    }
+                    for order in orders
+                ],
+            )
+        return orders
+
+
 class OrderUpdateSerializer(serializers.ModelSerializer):
     """
     Сериализатор для обновления заказа.
+    Уникальность номера стола проверяет БД при сохранении.
     """
 
     order_items = OrderItemSerializer(
@@ -117,6 +727,29 @@ class OrderUpdateSerializer(serializers.ModelSerializer):
             "status",
             "order_items",
         ]
+        extra_kwargs = {"table_number": {"validators": []}}
+
+    def validate_order_items(
+        self,
+        value: List[Dict[str, Any]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Проверяет, что каждое блюдо указано в заказе один раз.
+        """
+        dish_ids: List[int] = [item["dish"].pk for item in value]
+        if len(set(dish_ids)) != len(dish_ids):
+            raise serializers.ValidationError(
+                "Блюдо не может быть указано в заказе несколько раз.",
+            )
+        return value
+
+    def validate(self, attrs: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Добавляет сумму новых позиций заказа по ценам из БД.
+        """
+        if "order_items" in attrs:
+            attrs["total_amount"] = validated_total(attrs["order_items"])
+        return attrs
 
     def update(
         self,
@@ -130,6 +763,10 @@ class OrderUpdateSerializer(serializers.ModelSerializer):
             "order_items",
             None,
         )
+        total_amount: Optional[Decimal] = validated_data.pop(
+            "total_amount",
+            None,
+        )
 
         instance.table_number = validated_data.get(
             "table_number",
@@ -139,18 +776,56 @@ class OrderUpdateSerializer(serializers.ModelSerializer):
             "status",
             instance.status,
         )
-        instance.save()
-
-        if order_items_data is not None:
-            instance.order_items.all().delete()
-
-            for item_data in order_items_data:
-                dish: Any = item_data.get("dish")
-                if isinstance(dish, int):
-                    item_data["dish"] = Dish.objects.get(id=dish)
-                OrderItem.objects.create(
-                    order=instance,
-                    **item_data,
+        with transaction.atomic():
+            save_validated(instance)
+            if order_items_data is not None:
+                self._sync_order_items(
+                    instance,
+                    order_items_data,
+                    total_amount,
                 )
 
         return instance
+
+    def _sync_order_items(
+        self,
+        instance: Order,
+        order_items_data: List[Dict[str, Any]],
+        total_amount: Decimal,
+    ) -> None:
+        """
+        Приводит позиции заказа к переданному списку:
+        одним bulk_update меняет количество, одним bulk_create добавляет
+        новые блюда и одним DELETE убирает исчезнувшие.
+        """
+        existing: Dict[int, OrderItem] = {
+            item.dish_id: item for item in instance.order_items.all()
+        }
+        incoming: Dict[int, Dict[str, Any]] = {
+            item_data["dish"].pk: item_data for item_data in order_items_data
+        }
+
+        changed: List[OrderItem] = []
+        for dish_id, item in existing.items():
+            item_data = incoming.get(dish_id)
+            if item_data is not None and item.quantity != item_data["quantity"]:
+                item.quantity = item_data["quantity"]
+                changed.append(item)
+        created: List[OrderItem] = [
+            OrderItem(order=instance, **item_data)
+            for dish_id, item_data in incoming.items()
+            if dish_id not in existing
+        ]
+        removed: List[int] = [
+            dish_id for dish_id in existing if dish_id not in incoming
+        ]
+
+        if removed:
+            instance.order_items.filter(dish_id__in=removed).delete()
+        if changed:
+            OrderItem.objects.bulk_update(changed, ["quantity"])
+        if created:
+            OrderItem.objects.bulk_create(created)
+        if removed or changed or created:
+            Order.objects.filter(pk=instance.pk).refresh_totals()
+            instance.total_amount = total_amount
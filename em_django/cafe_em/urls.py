@@ -4,7 +4,7 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
-from cafe_em.views import api_views, web_views
+from cafe_em.views import api_views, stream_views, web_views
 
 
 app_name = "cafe_em"
@@ -27,6 +27,16 @@ router.register(
     api_views.OrderViewSet,
     basename="order",
 )
+router.register(
+    r"analytics",
+    api_views.AnalyticsViewSet,
+    basename="analytics",
+)
+router.register(
+    r"kitchen",
+    api_views.KitchenViewSet,
+    basename="kitchen",
+)
 router.register(
     r"dish",
     api_views.DishViewSet,
@@ -84,6 +94,11 @@ urlpatterns = [
         web_views.OrderTotalSumView.as_view(),
         name="total_sum",
     ),
+    path(
+        "api/orders/events/",
+        stream_views.order_events,
+        name="order-events",
+    ),
     path(
         "api/",
         include(router.urls),
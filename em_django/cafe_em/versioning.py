@@ -0,0 +1,124 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+from django.core.cache import cache
+from django.db import transaction
+
+T = TypeVar("T")
+
+# Сколько ждать процесс, который считает значение, прежде чем
+# посчитать его самому (например, если тот процесс упал).
+COMPUTE_LOCK_TIMEOUT: int = 10
+COMPUTE_POLL_INTERVAL: float = 0.05
+# Сколько живёт значение get_or_compute(), если его версию никто
+# не сбросил.
+COMPUTE_TIMEOUT: int = 300
+
+# Блокировки потоков по ключам кеша и число их пользователей.
+_key_locks: Dict[str, threading.Lock] = {}
+_key_lock_users: Dict[str, int] = {}
+_key_locks_guard = threading.Lock()
+
+
+def _version_key(name: str) -> str:
+    return f"cafe_em:version:{name}"
+
+
+def get_version(name: str) -> int:
+    """
+    Текущая версия данных name из общего кеша.
+    Новый счётчик начинается с текущего времени, чтобы после очистки кеша
+    версии не повторялись. Если кеш ничего не хранит, каждый вызов
+    возвращает новую версию.
+    """
+    key: str = _version_key(name)
+    version: Optional[int] = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        version = cache.get(key)
+    return version if version is not None else time.time_ns()
+
+
+def bump_version(name: str) -> None:
+    """
+    Увеличивает версию данных name, чтобы все процессы их перечитали.
+    """
+    key: str = _version_key(name)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), timeout=None)
+
+
+def invalidate(name: str) -> None:
+    """
+    Сбрасывает данные name во всех процессах: сразу и после коммита,
+    чтобы процесс, перечитавший их до коммита, перечитал их снова.
+    """
+    bump_version(name)
+    transaction.on_commit(lambda: bump_version(name))
+
+
+def get_or_compute(
+    key: str,
+    compute: Callable[[], T],
+    timeout: int = COMPUTE_TIMEOUT,
+) -> T:
+    """
+    Значение key из общего кеша или результат compute(), сохранённый
+    в кеш на timeout секунд. Одновременно значение считает один запрос:
+    потоки процесса ждут на блокировке своего ключа, другие процессы -
+    на ключе блокировки в кеше. Пока ждём другой процесс, блокировка
+    потоков не удерживается. compute() не должен возвращать None.
+    """
+    value: Any = cache.get(key)
+    if value is not None:
+        return value
+    lock_key: str = f"{key}:lock"
+    deadline: float = time.monotonic() + COMPUTE_LOCK_TIMEOUT
+    while True:
+        with _key_lock(key):
+            value = cache.get(key)
+            if value is not None:
+                return value
+            if cache.add(lock_key, True, timeout=COMPUTE_LOCK_TIMEOUT):
+                try:
+                    return _compute(key, compute, timeout)
+                finally:
+                    cache.delete(lock_key)
+            if time.monotonic() >= deadline:
+                # Процесс с блокировкой не успел (или упал): считаем
+                # сами, а его ключ блокировки не трогаем.
+                return _compute(key, compute, timeout)
+        time.sleep(COMPUTE_POLL_INTERVAL)
+
+
+def _compute(key: str, compute: Callable[[], T], timeout: int) -> T:
+    """
+    Считает значение и сохраняет его в кеш.
+    """
+    value: T = compute()
+    cache.set(key, value, timeout=timeout)
+    return value
+
+
+@contextmanager
+def _key_lock(key: str) -> Iterator[None]:
+    """
+    Блокировка потоков процесса для одного ключа кеша.
+    Запись о ней удаляется, когда блокировку больше никто не ждёт.
+    """
+    with _key_locks_guard:
+        lock: threading.Lock = _key_locks.setdefault(key, threading.Lock())
+        _key_lock_users[key] = _key_lock_users.get(key, 0) + 1
+    try:
+        with lock:
+            yield
+    finally:
+        with _key_locks_guard:
+            _key_lock_users[key] -= 1
+            if not _key_lock_users[key]:
+                del _key_lock_users[key]
+                del _key_locks[key]
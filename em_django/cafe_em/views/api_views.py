@@ -1,18 +1,48 @@
+from decimal import Decimal
 from typing import Optional
-from django.db.models import F, Sum
+from django.db import IntegrityError
+from django.db.models import QuerySet
+from django.http import HttpResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.http import parse_etags
 from rest_framework import status, viewsets
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework.filters import SearchFilter
 from rest_framework.request import Request
 
-from ..models import Dish, Order
+from ..analytics import (
+    average_order_value,
+    cached_report,
+    table_revenue,
+    top_dishes,
+)
+from ..export import EXPORT_FORMATS, iter_export, orders_for_export
+from ..filters import OrderSearchFilter
+from ..kitchen import kitchen_etag, kitchen_queue
+from ..listing import dish_list_data, dish_rows, order_list_data, order_rows
+from ..menu import menu
+from ..models import (
+    MAX_INTEGER,
+    TOTAL_AMOUNT_ERROR,
+    Dish,
+    Order,
+    OrderItem,
+    RevenueRollup,
+)
+from ..pagination import IdCursorPagination
+from ..revenue import paid_total
 from ..serializers import (
+    AnalyticsFilterSerializer,
     DishSerializer,
+    OrderBulkCreateSerializer,
+    OrderBulkStatusSerializer,
     OrderCreateSerializer,
+    OrderExportFilterSerializer,
+    OrderItemQuantitySerializer,
     OrderSerializer,
+    OrderStatusTransitionSerializer,
     OrderUpdateSerializer,
+    RevenueFilterSerializer,
 )
 
 
@@ -30,11 +60,24 @@ class OrderViewSet(viewsets.ModelViewSet):
 
     queryset = Order.objects.all().order_by("-id")
     serializer_class = OrderSerializer
-    filter_backends = [SearchFilter]
-    search_fields = [
-        "table_number",
-        "status",
-    ]
+    pagination_class = IdCursorPagination
+    filter_backends = [OrderSearchFilter]
+    lookup_value_regex = r"\d+"
+
+    def get_queryset(self) -> QuerySet[Order]:
+        """
+        Заказы с предзагруженными позициями.
+        """
+        return Order.objects.prefetch_related("order_items").order_by("-id")
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Список заказов без OrderSerializer: строки страницы
+        и их позиции читаются через values().
+        """
+        orders = self.filter_queryset(Order.objects.order_by("-id"))
+        page = self.paginate_queryset(order_rows(orders))
+        return self.get_paginated_response(order_list_data(page))
 
     @action(
         detail=False, methods=["get"], url_path=r"status/(?P<status>[^/.]+)"
@@ -45,9 +88,89 @@ class OrderViewSet(viewsets.ModelViewSet):
         """
         Фильтрует заказы по статусу.
         """
-        orders = self.queryset.filter(status=status.lower())
-        serializer = self.get_serializer(orders, many=True)
-        return Response(serializer.data)
+        orders = Order.objects.filter(status=status.lower())
+        page = self.paginate_queryset(order_rows(orders))
+        return self.get_paginated_response(order_list_data(page))
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="status/bulk",
+    )
+    def bulk_change_status(self, request: Request) -> Response:
+        """
+        Меняет статус многих заказов (ids или filter) одним UPDATE
+        по тем же правилам переходов, что и для одного заказа.
+        Возвращает результат по каждому заказу.
+        """
+        serializer = OrderBulkStatusSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        results = serializer.save()
+        return Response(
+            {
+                "status": serializer.validated_data["status"],
+                "changed": sum(
+                    result["outcome"] == "changed" for result in results
+                ),
+                "results": results,
+            }
+        )
+
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path="status",
+    )
+    def change_status(
+        self,
+        request: Request,
+        pk: Optional[str] = None,
+    ) -> Response:
+        """
+        Меняет статус заказа одним условным UPDATE.
+        Переход проверяется по ORDER_STATUS_TRANSITIONS: запрещённый
+        переход из текущего статуса даёт 400. Если заказ успел сменить
+        статус (или передан from_status, которого уже нет),
+        возвращается 409 с текущим статусом.
+        """
+        serializer = OrderStatusTransitionSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        order_id: int = int(pk)
+        if order_id > MAX_INTEGER:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        target: str = serializer.validated_data["status"]
+        from_status: Optional[str] = serializer.validated_data.get(
+            "from_status",
+        )
+        if Order.objects.transition([order_id], target, from_status):
+            return Response({"id": order_id, "status": target})
+        current: Optional[str] = (
+            Order.objects.filter(pk=order_id)
+            .values_list("status", flat=True)
+            .first()
+        )
+        if current is None:
+            return Response(status=status.HTTP_404_NOT_FOUND)
+        stale: bool = from_status is not None and from_status != current
+        if not stale and not Order.Status(current).can_transition_to(target):
+            response_status = status.HTTP_400_BAD_REQUEST
+        else:
+            response_status = status.HTTP_409_CONFLICT
+        return Response(
+            {
+                "detail": f"Переход из {current} в {target} невозможен.",
+                "status": current,
+            },
+            status=response_status,
+        )
 
     @action(
         detail=False,
@@ -73,6 +196,48 @@ class OrderViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="bulk",
+    )
+    def bulk_create_orders(
+        self,
+        request: Request,
+    ) -> Response:
+        """
+        Создает пачку заказов одним запросом.
+        Принимает список заказов или {"orders": [...]}
+        и возвращает id созданных заказов и ошибки по остальным.
+        """
+        data = request.data
+        if isinstance(data, list):
+            data = {"orders": data}
+        serializer = OrderBulkCreateSerializer(data=data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        try:
+            orders = serializer.save()
+        except IntegrityError:
+            return Response(
+                {"message": "Orders conflict with concurrent changes"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        return Response(
+            {
+                "created": [order.pk for order in orders],
+                "errors": serializer.row_errors,
+            },
+            status=(
+                status.HTTP_201_CREATED
+                if orders
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
+
     @action(detail=True, methods=["patch"], url_path="update")
     def partial_update_order(
         self,
@@ -96,6 +261,58 @@ class OrderViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
+    @action(
+        detail=True,
+        methods=["post"],
+        url_path=r"items/(?P<dish_id>\d+)/(?P<operation>increment|decrement)",
+    )
+    def change_item_quantity(
+        self,
+        request: Request,
+        pk: Optional[str] = None,
+        dish_id: Optional[str] = None,
+        operation: Optional[str] = None,
+    ) -> Response:
+        """
+        Атомарно увеличивает или уменьшает количество блюда в заказе.
+        Уменьшение до нуля удаляет позицию. Id блюда больше
+        MAX_INTEGER не может существовать и даёт 404.
+        """
+        serializer = OrderItemQuantitySerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        order = get_object_or_404(Order.objects.only("pk"), pk=pk)
+        quantity: int = serializer.validated_data["quantity"]
+        dish_pk: int = int(dish_id)
+
+        if operation == "increment":
+            dish = menu.get(dish_pk) if dish_pk <= MAX_INTEGER else None
+            if dish is None:
+                return Response(
+                    {"message": "Dish not found"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+            if not OrderItem.objects.increment(order.pk, dish.pk, quantity):
+                return Response(
+                    {"quantity": [TOTAL_AMOUNT_ERROR]},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        elif dish_pk > MAX_INTEGER or not OrderItem.objects.decrement(
+            order.pk,
+            dish_pk,
+            quantity,
+        ):
+            return Response(
+                {"message": "Order item not found"},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        order = self.get_queryset().get(pk=order.pk)
+        return Response(OrderSerializer(order).data)
+
     @action(detail=True, methods=["delete"], url_path="delete")
     def delete_order(
         self,
@@ -113,6 +330,36 @@ class OrderViewSet(viewsets.ModelViewSet):
             status=status.HTTP_204_NO_CONTENT,
         )
 
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"export/(?P<export_format>ndjson|csv)",
+    )
+    def export(
+        self,
+        request: Request,
+        export_format: Optional[str] = None,
+    ) -> HttpResponse:
+        """
+        Потоково выгружает заказы с позициями и суммами в NDJSON или CSV.
+        Фильтры: status, id_min, id_max.
+        """
+        filters = OrderExportFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(
+                filters.errors,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        orders = orders_for_export(**filters.validated_data)
+        response = StreamingHttpResponse(
+            iter_export(export_format, orders),
+            content_type=EXPORT_FORMATS[export_format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="orders.{export_format}"'
+        )
+        return response
+
     @action(
         detail=False,
         methods=["get"],
@@ -120,18 +367,126 @@ class OrderViewSet(viewsets.ModelViewSet):
     )
     def total_sum(self, request: Request) -> Response:
         """
-        Вычисляет общую сумму всех оплаченных заказов.
+        Общая сумма всех оплаченных заказов из кеша.
         """
-        total_sum: Optional[float] = (
-            Order.objects.filter(status=Order.Status.PAID).aggregate(
-                total=Sum(
-                    F("order_items__quantity") * F("order_items__dish__price")
-                )
-            )["total"]
-            or 0
-        )
+        total_sum: Decimal = paid_total()
         return Response({"total_sum": total_sum})
 
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="revenue",
+    )
+    def revenue(self, request: Request) -> Response:
+        """
+        Выручка за период по почасовым строкам RevenueRollup
+        без чтения заказов.
+        Параметры: date_from, date_to (включительно), group (day или hour).
+        """
+        filters = RevenueFilterSerializer(data=request.query_params)
+        if not filters.is_valid():
+            return Response(
+                filters.errors,
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        date_from = filters.validated_data["date_from"]
+        date_to = filters.validated_data["date_to"]
+        rollups = RevenueRollup.objects.between(date_from, date_to)
+        if filters.validated_data["group"] == "hour":
+            rows = rollups.by_hour()
+        else:
+            rows = rollups.by_day()
+        return Response(
+            {
+                "date_from": date_from,
+                "date_to": date_to,
+                **rollups.totals(),
+                "rows": list(rows),
+            }
+        )
+
+
+class AnalyticsViewSet(viewsets.ViewSet):
+    """
+    API отчётов по продажам оплаченных заказов.
+
+    Отчёты считаются группирующими запросами и кешируются
+    по параметрам запроса. Параметры: date_from, date_to (по дате
+    оплаты, включительно), limit, order_by (revenue или quantity).
+    """
+
+    def _filters(self, request: Request) -> AnalyticsFilterSerializer:
+        filters = AnalyticsFilterSerializer(data=request.query_params)
+        filters.is_valid(raise_exception=True)
+        return filters
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="top-dishes",
+    )
+    def top_dishes(self, request: Request) -> Response:
+        """
+        Самые продаваемые блюда по выручке или количеству.
+        Выручка блюд считается по их текущим ценам.
+        """
+        params = self._filters(request).validated_data
+        return Response(cached_report("top_dishes", top_dishes, **params))
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="tables",
+    )
+    def tables(self, request: Request) -> Response:
+        """
+        Столы с наибольшей выручкой.
+        """
+        params = self._filters(request).validated_data
+        params.pop("order_by")
+        return Response(cached_report("tables", table_revenue, **params))
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="average-order-value",
+    )
+    def average_order_value(self, request: Request) -> Response:
+        """
+        Число оплаченных заказов, выручка и средний чек.
+        """
+        params = self._filters(request).validated_data
+        params.pop("order_by")
+        params.pop("limit")
+        return Response(
+            cached_report("average", average_order_value, **params),
+        )
+
+
+class KitchenViewSet(viewsets.ViewSet):
+    """
+    API очереди кухни.
+    """
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path="queue",
+    )
+    def queue(self, request: Request) -> Response:
+        """
+        Блюда всех ожидающих заказов: общее количество по блюдам
+        и разбивка по заказам. Поддерживает If-None-Match:
+        если очередь не менялась, отвечает 304 без запросов к БД.
+        """
+        etag: str = kitchen_etag()
+        if etag in parse_etags(request.headers.get("If-None-Match", "")):
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            response = Response(kitchen_queue())
+        response["ETag"] = etag
+        return response
+
 
 class DishViewSet(viewsets.ModelViewSet):
     """
@@ -142,3 +497,11 @@ class DishViewSet(viewsets.ModelViewSet):
 
     queryset = Dish.objects.all().order_by("-id")
     serializer_class = DishSerializer
+    pagination_class = IdCursorPagination
+
+    def list(self, request: Request, *args, **kwargs) -> Response:
+        """
+        Список блюд без DishSerializer: строки читаются через values().
+        """
+        page = self.paginate_queryset(dish_rows(self.get_queryset()))
+        return self.get_paginated_response(dish_list_data(page))
@@ -0,0 +1,83 @@
+import json
+from typing import AsyncIterator, List, Optional
+
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import (
+    HttpRequest,
+    HttpResponse,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+
+from ..events import Event, bus
+
+# Как часто отправлять комментарий, чтобы прокси не закрыл соединение.
+KEEPALIVE_INTERVAL: float = 15.0
+
+
+def format_event(event: Event) -> str:
+    """
+    Событие в формате text/event-stream.
+    """
+    data: str = json.dumps(event.data, cls=DjangoJSONEncoder)
+    return f"id: {event.id}\nevent: {event.type}\ndata: {data}\n\n"
+
+
+def _last_event_id(request: HttpRequest) -> Optional[int]:
+    """
+    Номер последнего полученного события из заголовка Last-Event-ID
+    (его отправляет EventSource при переподключении)
+    или из параметра last_event_id.
+    """
+    value: str = request.headers.get(
+        "Last-Event-ID",
+        request.GET.get("last_event_id", ""),
+    )
+    return int(value) if value.isdecimal() else None
+
+
+async def iter_events(last_id: Optional[int]) -> AsyncIterator[str]:
+    """
+    Бесконечный поток событий после last_id.
+    Если продолжить с last_id нельзя, отправляется событие reset:
+    клиент должен заново загрузить заказы.
+    """
+    if last_id is None:
+        last_id = bus.last_id
+    while True:
+        events: Optional[List[Event]] = await bus.wait(
+            last_id,
+            KEEPALIVE_INTERVAL,
+        )
+        if events is None:
+            last_id = bus.last_id
+            yield f"id: {last_id}\nevent: reset\ndata: {{}}\n\n"
+        elif not events:
+            yield ": keepalive\n\n"
+        for event in events or []:
+            last_id = event.id
+            yield format_event(event)
+
+
+async def order_events(request: HttpRequest) -> HttpResponse:
+    """
+    Поток событий заказов (Server-Sent Events): order.created,
+    order.updated, order.status_changed, order.deleted.
+    Поддерживает продолжение по Last-Event-ID.
+    Работает только через ASGI (em_django.asgi): WSGI-сервер
+    (в том числе runserver) читает бесконечный поток целиком
+    и зависает, поэтому там ответ - 501.
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"message": "Поток событий доступен только через ASGI."},
+            status=501,
+        )
+    response = StreamingHttpResponse(
+        iter_events(_last_event_id(request)),
+        content_type="text/event-stream",
+    )
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -1,4 +1,5 @@
-from typing import Any, Dict, Optional, Union
+from decimal import Decimal
+from typing import Any, Dict, Optional
 from django.http import HttpResponse
 from django.shortcuts import redirect
 from django.urls import reverse_lazy
@@ -10,8 +11,9 @@ from django.views.generic import (
     DeleteView,
     TemplateView,
 )
-from django.db.models import F, Sum, Q, QuerySet
+from django.db.models import QuerySet
 
+from ..filters import search_orders
 from ..forms import (
     DishForm,
     OrderCreateForm,
@@ -19,41 +21,29 @@ from ..forms import (
     OrderUpdateForm,
 )
 from ..models import Dish, Order
+from ..pagination import NoCountPaginator
+from ..revenue import paid_total
 
 
 class OrderListView(ListView):
     """
     Представление для отображения списка заказов.
-    STATUS_TRANSLATION - Словарь для перевода строки из запроса в статус заказа
     """
 
     model = Order
     context_object_name = "orders"
     paginate_by = 5
-
-    STATUS_TRANSLATION: Dict[str, Union[str, Order.Status]] = {
-        "в ожидании": Order.Status.WAITING,
-        "готово": Order.Status.READY,
-        "оплачено": Order.Status.PAID,
-    }
+    paginator_class = NoCountPaginator
 
     def get_queryset(self) -> QuerySet[Order]:
         """
         Возвращает отсортированный по убыванию
-        и отфильтрованный(если надо) список заказов.
+        и отфильтрованный(если надо) список заказов
+        с предзагруженными позициями и блюдами.
         """
-        queryset: QuerySet[Order] = Order.objects.order_by("-id")
+        queryset: QuerySet[Order] = Order.objects.with_items().order_by("-id")
         query: Optional[str] = self.request.GET.get("q")
-
-        if query:
-            translated_status: Optional[Union[str, Order.Status]] = (
-                self.STATUS_TRANSLATION.get(query.lower())
-            )
-            queryset = queryset.filter(
-                Q(table_number__icontains=query)
-                | Q(status=translated_status if translated_status else query)
-            )
-        return queryset
+        return search_orders(queryset, query)
 
 
 class OrderDetailView(DetailView):
@@ -63,6 +53,12 @@ class OrderDetailView(DetailView):
 
     model = Order
 
+    def get_queryset(self) -> QuerySet[Order]:
+        """
+        Заказ с предзагруженными позициями и блюдами.
+        """
+        return Order.objects.with_items()
+
 
 class OrderCreateView(CreateView):
     """
@@ -96,7 +92,7 @@ class OrderCreateView(CreateView):
             order_items.instance = self.object
 
             if order_items.is_valid():
-                self.object.save()
+                self.object.save(validated=True)
                 order_items.save()
                 return redirect(self.success_url)
 
@@ -163,17 +159,10 @@ class OrderTotalSumView(TemplateView):
 
     def get_context_data(self, **kwargs: Any) -> Dict[str, Any]:
         """
-        Вычисляет общую сумму заказа, где статус заказа 'оплачено'.
+        Общая сумма заказов, где статус заказа 'оплачено', из кеша.
         """
         context: Dict[str, Any] = super().get_context_data(**kwargs)
-        total_sum: Optional[float] = (
-            Order.objects.filter(status=Order.Status.PAID).aggregate(
-                total=Sum(
-                    F("order_items__quantity") * F("order_items__dish__price")
-                )
-            )["total"]
-            or 0
-        )
+        total_sum: Decimal = paid_total()
         context["total_sum"] = total_sum
         return context
 
@@ -186,6 +175,7 @@ class DishListView(ListView):
     model = Dish
     context_object_name = "dishs"
     paginate_by = 5
+    paginator_class = NoCountPaginator
 
     def get_queryset(self) -> QuerySet[Dish]:
         """
@@ -85,6 +85,20 @@ DATABASES = {
 }
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Кеш меню и версии данных хранятся здесь. При нескольких процессах
+# нужен общий бэкенд (Redis, Memcached), иначе каждый процесс
+# видит только свои версии.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'cafe_em',
+    }
+}
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
 
@@ -3,6 +3,7 @@ import django
 import pytest
 
 from cafe_em.models import Dish, Order, OrderItem
+from django.core.cache import cache
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "em_django.settings")
 django.setup()
@@ -10,6 +11,11 @@ django.setup()
 pytestmark = pytest.mark.django_db
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
 @pytest.fixture
 def dish(db):
     return Dish.objects.create(name="Борщ", price=3.5)
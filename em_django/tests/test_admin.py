@@ -0,0 +1,162 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from cafe_em.models import Dish, Order, OrderItem
+
+
+@pytest.fixture
+def orders(db):
+    dishes = [
+        Dish.objects.create(name="Борщ", price=10.00),
+        Dish.objects.create(name="Чай", price=2.00),
+    ]
+    orders = []
+    for number in range(1, 6):
+        order = Order.objects.create(
+            table_number=number,
+            status="paid" if number % 2 else "waiting",
+        )
+        for dish in dishes:
+            OrderItem.objects.create(order=order, dish=dish, quantity=number)
+        orders.append(order)
+    return orders
+
+
+def _changelist_ids(response):
+    return [obj.pk for obj in response.context["cl"].result_list]
+
+
+def _count_queries(admin_client, url, params=None):
+    with CaptureQueriesContext(connection) as queries:
+        response = admin_client.get(url, params or {})
+    assert response.status_code == 200
+    return len(queries.captured_queries)
+
+
+@pytest.mark.parametrize(
+    "model_name",
+    ["order", "orderitem"],
+)
+def test_changelist_queries_do_not_grow(admin_client, orders, model_name):
+    url = reverse(f"admin:cafe_em_{model_name}_changelist")
+    before = _count_queries(admin_client, url)
+
+    dish = Dish.objects.create(name="Суп", price=5.00)
+    for number in range(100, 120):
+        order = Order.objects.create(table_number=number)
+        OrderItem.objects.create(order=order, dish=dish, quantity=1)
+
+    assert _count_queries(admin_client, url) == before
+
+
+def test_order_changelist_sorts_by_total(admin_client, orders):
+    url = reverse("admin:cafe_em_order_changelist")
+    # Колонка total_price - четвёртая в list_display.
+    response = admin_client.get(url, {"o": "-4"})
+
+    assert _changelist_ids(response) == [
+        order.pk for order in reversed(orders)
+    ]
+
+
+def test_order_changelist_range_filters(admin_client, orders):
+    url = reverse("admin:cafe_em_order_changelist")
+
+    response = admin_client.get(url, {"table_range": "2-4"})
+    assert sorted(_changelist_ids(response)) == [
+        order.pk for order in orders[1:4]
+    ]
+
+    response = admin_client.get(url, {"id_range": str(orders[0].pk)})
+    assert _changelist_ids(response) == [orders[0].pk]
+
+    response = admin_client.get(url, {"table_range": "abc"})
+    assert _changelist_ids(response) == []
+
+    response = admin_client.get(url, {"id_range": "1-99999999999999999999"})
+    assert sorted(_changelist_ids(response)) == sorted(
+        order.pk for order in orders
+    )
+
+
+def test_order_changelist_search_uses_exact_lookups(admin_client, orders):
+    url = reverse("admin:cafe_em_order_changelist")
+
+    response = admin_client.get(url, {"q": "3"})
+    assert _changelist_ids(response) == [orders[2].pk]
+
+    response = admin_client.get(url, {"q": "в ожидании"})
+    assert sorted(_changelist_ids(response)) == [
+        orders[1].pk,
+        orders[3].pk,
+    ]
+
+
+def test_order_change_page_does_not_render_menu(admin_client, orders):
+    Dish.objects.bulk_create(
+        Dish(name=f"Блюдо меню {number}", price=1.00) for number in range(50)
+    )
+    url = reverse("admin:cafe_em_order_change", args=[orders[0].pk])
+    response = admin_client.get(url)
+
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert "Блюдо меню" not in content
+    assert "Борщ" in content
+
+
+def test_dish_autocomplete_searches_name_prefix(admin_client, orders):
+    Dish.objects.create(name="pasta al pesto", price=12.00)
+    Dish.objects.create(name="Pasta", price=9.00)
+    Dish.objects.create(name="Antipasta", price=7.00)
+    response = admin_client.get(
+        reverse("admin:autocomplete"),
+        {
+            "term": "PAS",
+            "app_label": "cafe_em",
+            "model_name": "orderitem",
+            "field_name": "dish",
+        },
+    )
+
+    assert response.status_code == 200
+    names = [result["text"] for result in response.json()["results"]]
+    assert names == ["Pasta", "pasta al pesto"]
+
+
+def test_dish_autocomplete_query_uses_name_index(admin_client, orders):
+    url = reverse("admin:autocomplete")
+    params = {
+        "term": "Бор",
+        "app_label": "cafe_em",
+        "model_name": "orderitem",
+        "field_name": "dish",
+    }
+    with CaptureQueriesContext(connection) as queries:
+        admin_client.get(url, params)
+
+    [sql] = [
+        query["sql"]
+        for query in queries.captured_queries
+        if 'FROM "cafe_em_dish"' in query["sql"] and "LIMIT" in query["sql"]
+    ]
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+        plan = " ".join(row[-1] for row in cursor.fetchall())
+    assert "dish_name_nocase_idx" in plan
+
+
+def test_order_item_admin_rejects_overflowing_total(admin_client, orders):
+    item = orders[0].order_items.first()
+    url = reverse("admin:cafe_em_orderitem_change", args=[item.pk])
+    response = admin_client.post(
+        url,
+        {"order": item.order_id, "dish": item.dish_id, "quantity": 10**15},
+    )
+
+    assert response.status_code == 200
+    assert "Сумма заказа должна быть меньше" in response.content.decode()
+    item.refresh_from_db()
+    assert item.quantity == 1
@@ -0,0 +1,107 @@
+from decimal import Decimal
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cafe_em.models import Dish, Order, OrderItem
+
+
+@pytest.fixture
+def sales(db):
+    soup = Dish.objects.create(name="Борщ", price=10.00)
+    tea = Dish.objects.create(name="Чай", price=2.00)
+    first = Order.objects.create(table_number=1, status="paid")
+    OrderItem.objects.create(order=first, dish=soup, quantity=1)
+    OrderItem.objects.create(order=first, dish=tea, quantity=3)
+    second = Order.objects.create(table_number=2, status="paid")
+    OrderItem.objects.create(order=second, dish=soup, quantity=2)
+    waiting = Order.objects.create(table_number=3)
+    OrderItem.objects.create(order=waiting, dish=tea, quantity=50)
+    return soup, tea, first, second
+
+
+def test_top_dishes_by_revenue_and_quantity(sales):
+    soup, tea, first, second = sales
+    url = reverse("cafe_em:analytics-top-dishes")
+    client = APIClient()
+
+    response = client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert [
+        (row["name"], row["quantity_sold"], row["revenue"]) for row in response.data
+    ] == [("Борщ", 3, Decimal("30.00")), ("Чай", 3, Decimal("6.00"))]
+
+    response = client.get(url, {"order_by": "quantity", "limit": 1})
+    assert [row["dish"] for row in response.data] == [soup.id]
+
+
+def test_top_dishes_use_current_prices(sales):
+    # Выручка блюд - по текущим ценам, суммы оплаченных заказов не меняются
+    soup = sales[0]
+    soup.price = 12
+    soup.save()
+    client = APIClient()
+
+    response = client.get(reverse("cafe_em:analytics-top-dishes"))
+    assert response.data[0]["revenue"] == Decimal("36.00")
+    response = client.get(reverse("cafe_em:analytics-tables"))
+    assert response.data[0]["revenue"] == Decimal("20.00")
+
+
+def test_table_revenue_and_average(sales):
+    client = APIClient()
+
+    response = client.get(reverse("cafe_em:analytics-tables"))
+    assert [
+        (row["table_number"], row["revenue"]) for row in response.data
+    ] == [(2, Decimal("20.00")), (1, Decimal("16.00"))]
+
+    response = client.get(reverse("cafe_em:analytics-average-order-value"))
+    assert response.data == {
+        "orders_count": 2,
+        "revenue": Decimal("36.00"),
+        "average": Decimal("18.00"),
+    }
+
+    today = timezone.localdate()
+    response = client.get(
+        reverse("cafe_em:analytics-average-order-value"),
+        {"date_to": today - timezone.timedelta(days=1)},
+    )
+    assert response.data["orders_count"] == 0
+
+
+def test_reports_are_cached_until_sales_change(sales):
+    soup, tea, first, second = sales
+    url = reverse("cafe_em:analytics-top-dishes")
+    client = APIClient()
+    client.get(url)
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    assert len(queries) == 0
+
+    item = first.order_items.get(dish=tea)
+    item.quantity = 10
+    item.save()
+    response = client.get(url, {"order_by": "quantity"})
+    assert response.data[0]["quantity_sold"] == 10
+
+    tea.price = 5
+    tea.save()
+    response = client.get(url)
+    assert response.data[0]["revenue"] == Decimal("50.00")
+
+
+def test_report_filters_are_validated(db):
+    response = APIClient().get(
+        reverse("cafe_em:analytics-top-dishes"),
+        {"limit": 0, "order_by": "name"},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert set(response.data) == {"limit", "order_by"}
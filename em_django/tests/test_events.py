@@ -0,0 +1,130 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from cafe_em.events import EventBus, bus
+from cafe_em.models import Dish, Order, OrderItem
+
+
+def test_event_bus_resumes_from_last_id():
+    events = EventBus(history=3)
+    for number in range(5):
+        events.publish("order.updated", {"id": number})
+
+    assert [event.data["id"] for event in events.since(3)] == [3, 4]
+    assert events.since(5) == []
+    # События 2 и 3 уже вытеснены из истории.
+    assert events.since(0) is None
+    # Номер из другого запуска процесса.
+    assert events.since(10) is None
+
+
+def test_event_bus_wakes_waiters_from_other_threads():
+    events = EventBus()
+
+    async def wait():
+        publisher = threading.Timer(
+            0.05,
+            events.publish,
+            args=("order.created", {"id": 1}),
+        )
+        publisher.start()
+        return await events.wait(0, timeout=5)
+
+    [event] = asyncio.run(wait())
+    assert event.type == "order.created"
+    assert asyncio.run(events.wait(1, timeout=0.01)) == []
+
+
+@pytest.mark.django_db
+def test_order_changes_publish_events(django_capture_on_commit_callbacks):
+    last_id = bus.last_id
+    with django_capture_on_commit_callbacks(execute=True):
+        dish = Dish.objects.create(name="Борщ", price=10.00)
+        order = Order.objects.create(table_number=1)
+    with django_capture_on_commit_callbacks(execute=True):
+        OrderItem.objects.create(order=order, dish=dish, quantity=1)
+    with django_capture_on_commit_callbacks(execute=True):
+        OrderItem.objects.increment(order.id, dish.id)
+    with django_capture_on_commit_callbacks(execute=True):
+        order.status = "ready"
+        order.save()
+    with django_capture_on_commit_callbacks(execute=True):
+        order_id = order.id
+        order.delete()
+
+    events = bus.since(last_id)
+    assert [(event.type, event.data["id"]) for event in events] == [
+        ("order.created", order_id),
+        ("order.updated", order_id),
+        ("order.updated", order_id),
+        ("order.status_changed", order_id),
+        ("order.deleted", order_id),
+    ]
+    # Все события заказа несут одни и те же поля.
+    for event in events:
+        assert event.data["table_number"] == 1
+    assert [event.data["status"] for event in events] == [
+        "waiting",
+        "waiting",
+        "waiting",
+        "ready",
+        "ready",
+    ]
+    assert events[3].data["previous_status"] == "waiting"
+
+
+@pytest.mark.django_db
+def test_bulk_transition_events_match_order_events(
+    django_capture_on_commit_callbacks,
+):
+    order = Order.objects.create(table_number=4)
+    last_id = bus.last_id
+    with django_capture_on_commit_callbacks(execute=True):
+        Order.objects.transition([order.id], Order.Status.READY)
+
+    [event] = bus.since(last_id)
+    assert event.type == "order.status_changed"
+    assert event.data == {
+        "id": order.id,
+        "table_number": 4,
+        "status": "ready",
+        "previous_status": "waiting",
+    }
+
+
+def test_order_events_need_asgi():
+    # Под WSGI бесконечный поток завис бы, поэтому сразу 501
+    response = Client().get(reverse("cafe_em:order-events"))
+    assert response.status_code == 501
+
+
+def test_order_events_stream_resumes_after_last_event_id():
+    first = bus.publish("order.created", {"id": 1})
+    bus.publish("order.status_changed", {"id": 1, "status": "ready"})
+
+    async def read_first_event():
+        response = await AsyncClient().get(
+            reverse("cafe_em:order-events"),
+            headers={"Last-Event-ID": str(first.id)},
+        )
+        chunks = response.streaming_content
+        chunk = await anext(chunks)
+        await chunks.aclose()
+        return response, chunk
+
+    response, chunk = asyncio.run(read_first_event())
+    assert response["Content-Type"] == "text/event-stream"
+    lines = (
+        chunk.decode() if isinstance(chunk, bytes) else chunk
+    ).splitlines()
+    assert lines[0] == f"id: {first.id + 1}"
+    assert lines[1] == "event: order.status_changed"
+    assert json.loads(lines[2].removeprefix("data: ")) == {
+        "id": 1,
+        "status": "ready",
+    }
@@ -0,0 +1,86 @@
+import csv
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cafe_em.models import Dish, Order, OrderItem
+
+
+@pytest.fixture
+def orders(db):
+    dish = Dish.objects.create(name="Борщ", price=10.00)
+    waiting = Order.objects.create(table_number=1, status="waiting")
+    OrderItem.objects.create(order=waiting, dish=dish, quantity=2)
+    paid = Order.objects.create(table_number=2, status="paid")
+    OrderItem.objects.create(order=paid, dish=dish, quantity=1)
+    empty = Order.objects.create(table_number=3, status="paid")
+    return waiting, paid, empty
+
+
+def test_export_ndjson_streams_orders(orders):
+    waiting, paid, empty = orders
+    url = reverse(
+        "cafe_em:order-export",
+        kwargs={"export_format": "ndjson"},
+    )
+    response = APIClient().get(url)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.streaming
+    lines = b"".join(response.streaming_content).decode().splitlines()
+    records = [json.loads(line) for line in lines]
+    assert [record["id"] for record in records] == [
+        waiting.id,
+        paid.id,
+        empty.id,
+    ]
+    assert records[0]["total_amount"] == "20.00"
+    [item] = records[0]["order_items"]
+    assert item["dish_name"] == "Борщ"
+    assert item["price"] == "10.00"
+    assert item["quantity"] == 2
+    assert records[2]["order_items"] == []
+
+
+def test_export_csv_filters_by_status_and_id(orders):
+    waiting, paid, empty = orders
+    url = reverse(
+        "cafe_em:order-export",
+        kwargs={"export_format": "csv"},
+    )
+    response = APIClient().get(url, {"status": "paid", "id_max": paid.id})
+
+    assert response.status_code == status.HTTP_200_OK
+    content = b"".join(response.streaming_content).decode()
+    rows = list(csv.DictReader(StringIO(content)))
+    assert [row["order_id"] for row in rows] == [str(paid.id)]
+    assert rows[0]["quantity"] == "1"
+
+
+def test_export_rejects_unknown_status(orders):
+    url = reverse(
+        "cafe_em:order-export",
+        kwargs={"export_format": "csv"},
+    )
+    response = APIClient().get(url, {"status": "lost"})
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+def test_export_orders_command(orders):
+    waiting, paid, empty = orders
+    stdout = StringIO()
+    call_command(
+        "export_orders",
+        "--status=paid",
+        "--chunk-size=1",
+        stdout=stdout,
+    )
+
+    records = [json.loads(line) for line in stdout.getvalue().splitlines()]
+    assert [record["id"] for record in records] == [paid.id, empty.id]
@@ -0,0 +1,123 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cafe_em.models import Dish, Order, OrderItem
+
+
+@pytest.fixture
+def queue(db):
+    soup = Dish.objects.create(name="Борщ", price=10.00)
+    tea = Dish.objects.create(name="Чай", price=2.00)
+    first = Order.objects.create(table_number=1)
+    OrderItem.objects.create(order=first, dish=soup, quantity=1)
+    OrderItem.objects.create(order=first, dish=tea, quantity=2)
+    second = Order.objects.create(table_number=2)
+    OrderItem.objects.create(order=second, dish=tea, quantity=3)
+    ready = Order.objects.create(table_number=3, status="ready")
+    OrderItem.objects.create(order=ready, dish=soup, quantity=5)
+    return soup, tea, first, second
+
+
+def test_kitchen_queue_totals_and_orders(queue):
+    soup, tea, first, second = queue
+    with CaptureQueriesContext(connection) as queries:
+        response = APIClient().get(reverse("cafe_em:kitchen-queue"))
+
+    assert response.status_code == status.HTTP_200_OK
+    assert len(queries) == 1
+    assert response.data["dishes"] == [
+        {"dish": tea.id, "name": "Чай", "quantity": 5},
+        {"dish": soup.id, "name": "Борщ", "quantity": 1},
+    ]
+    assert [
+        (order["table_number"], len(order["items"]))
+        for order in response.data["orders"]
+    ] == [(1, 2), (2, 1)]
+
+
+def test_kitchen_queue_conditional_requests(queue):
+    soup, tea, first, second = queue
+    url = reverse("cafe_em:kitchen-queue")
+    client = APIClient()
+    etag = client.get(url)["ETag"]
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert len(queries) == 0
+
+    second.status = "ready"
+    second.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+    assert response.data["dishes"][0]["quantity"] == 2
+
+    etag = response["ETag"]
+    OrderItem.objects.increment(first.id, soup.id)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["dishes"][0] == {
+        "dish": soup.id,
+        "name": "Борщ",
+        "quantity": 2,
+    }
+
+
+def test_kitchen_queue_follows_table_number(queue):
+    # Номер стола виден в очереди, поэтому его смена даёт новый ETag
+    client = APIClient()
+    url = reverse("cafe_em:kitchen-queue")
+    etag = client.get(url)["ETag"]
+    second = queue[3]
+
+    response = client.patch(
+        reverse(
+            "cafe_em:order-partial-update-order",
+            kwargs={"pk": second.pk},
+        ),
+        {"table_number": 7},
+        format="json",
+    )
+    assert response.status_code == status.HTTP_200_OK
+
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+    assert [order["table_number"] for order in response.data["orders"]] == [
+        1,
+        7,
+    ]
+
+
+def test_kitchen_queue_follows_free_dishes(queue):
+    # Позиция с нулевой ценой не меняет сумму заказа, но видна в очереди
+    first = queue[2]
+    water = Dish.objects.create(name="Вода", price=0)
+    client = APIClient()
+    url = reverse("cafe_em:kitchen-queue")
+    etag = client.get(url)["ETag"]
+
+    item = OrderItem.objects.create(order=first, dish=water, quantity=1)
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert {"dish": water.id, "name": "Вода", "quantity": 1} in (
+        response.data["dishes"]
+    )
+
+    etag = response["ETag"]
+    item.quantity = 4
+    item.save()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert response["ETag"] != etag
+
+    etag = response["ETag"]
+    item.delete()
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == status.HTTP_200_OK
+    assert water.id not in [dish["dish"] for dish in response.data["dishes"]]
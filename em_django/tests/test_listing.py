@@ -0,0 +1,59 @@
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from rest_framework.renderers import JSONRenderer
+
+from cafe_em.listing import (
+    dish_list_data,
+    dish_rows,
+    order_list_data,
+    order_rows,
+)
+from cafe_em.models import Dish, Order, OrderItem
+from cafe_em.serializers import DishSerializer, OrderSerializer
+
+
+@pytest.mark.django_db
+def test_list_data_matches_serializers():
+    dishes = [
+        Dish.objects.create(name="Борщ", price=10),
+        Dish.objects.create(name="Чай", price=Decimal("2.5")),
+        Dish.objects.create(name="Хлеб", price=Decimal("0.05")),
+    ]
+    for table_number, status in enumerate(Order.Status.values):
+        order = Order.objects.create(table_number=table_number, status=status)
+        for quantity, dish in enumerate(dishes[table_number:], start=1):
+            OrderItem.objects.create(order=order, dish=dish, quantity=quantity)
+    Order.objects.create(table_number=10)
+    orders = Order.objects.order_by("-id")
+
+    expected = OrderSerializer(
+        orders.prefetch_related("order_items"),
+        many=True,
+    ).data
+    data = order_list_data(list(order_rows(orders)))
+    assert data == expected
+    assert JSONRenderer().render(data) == JSONRenderer().render(expected)
+
+    expected = DishSerializer(Dish.objects.order_by("-id"), many=True).data
+    data = dish_list_data(list(dish_rows(Dish.objects.order_by("-id"))))
+    assert data == expected
+    assert [dish["price"] for dish in data] == ["0.05", "2.50", "10.00"]
+    assert order_list_data([]) == []
+
+
+@pytest.mark.django_db
+def test_benchmark_list_serializers():
+    stdout = StringIO()
+    call_command(
+        "benchmark_list_serializers",
+        rows=20,
+        repeat=1,
+        stdout=stdout,
+    )
+    output = stdout.getvalue()
+    assert "orders: serializer" in output
+    assert "dishes: serializer" in output
+    assert not Order.objects.exists()
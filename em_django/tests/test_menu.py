@@ -0,0 +1,94 @@
+import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from cafe_em.forms import OrderItemForm
+from cafe_em.menu import menu
+from cafe_em.models import Dish, Order
+
+
+@pytest.mark.django_db
+def test_menu_lookups_without_queries():
+    soup = Dish.objects.create(name="Борщ", price=10.00)
+    tea = Dish.objects.create(name="Чай", price=2.00)
+    menu.in_bulk([soup.id])
+
+    with CaptureQueriesContext(connection) as queries:
+        dishes = menu.in_bulk([soup.id, tea.id])
+        assert menu.get(tea.id).name == "Чай"
+
+    assert len(queries) == 0
+    assert set(dishes) == {soup.id, tea.id}
+
+
+@pytest.mark.django_db
+def test_menu_reloads_after_dish_changes():
+    soup = Dish.objects.create(name="Борщ", price=10.00)
+    assert menu.get(soup.id).price == 10
+
+    soup.price = 12
+    soup.save()
+    assert menu.get(soup.id).price == 12
+
+    soup_id = soup.id
+    soup.delete()
+    assert menu.get(soup_id) is None
+
+
+@pytest.mark.django_db
+def test_menu_checks_unknown_ids_in_database():
+    menu.in_bulk([])
+    dish_id = Dish.objects.bulk_create([Dish(name="Чай", price=2.00)])[0].id
+
+    assert menu.get(dish_id).name == "Чай"
+    assert menu.get(dish_id + 1) is None
+
+
+@pytest.mark.django_db
+def test_menu_skips_out_of_range_ids():
+    soup = Dish.objects.create(name="Борщ", price=10.00)
+    menu.in_bulk([])
+    huge = 10**20
+
+    with CaptureQueriesContext(connection) as queries:
+        dishes = menu.in_bulk([soup.id, huge, -huge])
+
+    assert len(queries) == 0
+    assert set(dishes) == {soup.id}
+    form = OrderItemForm(data={"dish": str(huge), "quantity": 1})
+    assert not form.is_valid()
+    assert "dish" in form.errors
+
+
+@pytest.mark.django_db
+def test_order_totals_use_database_prices():
+    # Цену изменил другой процесс: кеш меню этого процесса
+    # её не видит, но суммы заказов считаются по БД
+    soup = Dish.objects.create(name="Борщ", price=10.00)
+    assert menu.get(soup.id).price == 10
+    Dish.objects.filter(pk=soup.id).update(price=12)
+
+    response = APIClient().post(
+        reverse("cafe_em:order-create-order"),
+        {"table_number": 1, "order_items": [{"dish": soup.id}]},
+        format="json",
+    )
+    assert response.status_code == 201
+    assert Order.objects.get(table_number=1).total_amount == 12
+
+    response = Client().post(
+        reverse("cafe_em:order_form"),
+        {
+            "table_number": 2,
+            "order_items-TOTAL_FORMS": 1,
+            "order_items-INITIAL_FORMS": 0,
+            "order_items-0-dish": soup.id,
+            "order_items-0-quantity": 2,
+        },
+    )
+    assert response.status_code == 302
+    assert Order.objects.get(table_number=2).total_amount == 24
+    assert menu.get(soup.id).price == 10
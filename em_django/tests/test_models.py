@@ -1,5 +1,15 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.core.management import call_command
+from django.db import connection, transaction
 from django.forms import ValidationError
+from django.test.utils import CaptureQueriesContext
 import pytest
+from cafe_em.management.commands.explain_hot_paths import (
+    Command as ExplainCommand,
+)
 from cafe_em.models import Dish, Order, OrderItem
 
 
@@ -87,3 +97,136 @@ def test_create_dish_with_invalid_price():
     # Проверка, что нельзя создать блюдо с отрицательной ценой
     with pytest.raises(ValidationError):  # Ожидаем ошибку из-за отрицательной цены
         Dish.objects.create(name="Invalid Dish", price=-5.0)
+
+
+def test_order_total_amount_follows_items(order, dish):
+    # Сумма заказа хранится в total_amount и меняется вместе с позициями
+    item = OrderItem.objects.create(order=order, dish=dish, quantity=2)
+    assert order.total_amount == Decimal("7.00")
+    item.quantity = 4
+    item.save()
+    order.refresh_from_db()
+    assert order.total_amount == Decimal("14.00")
+    item.delete()
+    order.refresh_from_db()
+    assert order.total_amount == Decimal("0.00")
+
+
+def test_order_save_keeps_total_amount(order_item):
+    # Сохранение устаревшего экземпляра заказа не затирает сумму
+    stale_order = Order.objects.get(pk=order_item.order_id)
+    OrderItem.objects.filter(pk=order_item.pk).get().delete()
+    stale_order.status = "ready"
+    stale_order.save()
+    stale_order.refresh_from_db()
+    assert stale_order.total_amount == Decimal("0.00")
+
+
+def test_dish_price_change_updates_open_orders(dish, order_item):
+    # Новая цена блюда пересчитывает только неоплаченные заказы
+    paid_order = Order.objects.create(table_number=2, status="paid")
+    OrderItem.objects.create(order=paid_order, dish=dish, quantity=1)
+    dish.price = Decimal("5.00")
+    dish.save()
+    order_item.order.refresh_from_db()
+    paid_order.refresh_from_db()
+    assert order_item.order.total_amount == Decimal("10.00")
+    assert paid_order.total_amount == Decimal("3.50")
+
+
+def test_reconcile_order_totals_repairs_drift(order_item):
+    # Команда сверки исправляет расхождение суммы с позициями
+    Order.objects.filter(pk=order_item.order_id).update(total_amount=1)
+    call_command("reconcile_order_totals", stdout=StringIO())
+    order_item.order.refresh_from_db()
+    assert order_item.order.total_amount == Decimal("7.00")
+    assert not Order.objects.drifted().exists()
+
+
+@pytest.mark.django_db
+def test_explain_hot_paths_without_full_scans():
+    # Горячие запросы представлений используют индексы
+    stdout = StringIO()
+    call_command("explain_hot_paths", stdout=stdout)
+    assert "Полных чтений таблиц нет." in stdout.getvalue()
+    assert not Order.objects.exists()
+
+
+def test_explain_hot_paths_counts_index_scans():
+    # Чтение всей таблицы по покрывающему индексу - тоже полное чтение
+    full_scans = ExplainCommand()._full_scans
+    count = 'SELECT COUNT(*) AS "__count" FROM "cafe_em_order"'
+    plan = ["SCAN cafe_em_order USING COVERING INDEX order_status_idx"]
+    assert full_scans(count, plan) == plan
+    assert full_scans(count, ["SCAN TABLE cafe_em_order"]) != []
+    assert full_scans("SELECT 1", ["SCAN CONSTANT ROW"]) == []
+    page = 'SELECT "id" FROM "cafe_em_order" ORDER BY "id" DESC LIMIT 6'
+    assert full_scans(page, ["SCAN cafe_em_order"]) == []
+    search = (
+        'SELECT "id" FROM "cafe_em_order" WHERE "status" = %s LIMIT 6'
+    )
+    assert full_scans(search, plan) == plan
+
+
+def test_order_status_transitions(db):
+    assert Order.Status.WAITING.can_transition_to(Order.Status.READY)
+    assert not Order.Status.WAITING.can_transition_to(Order.Status.PAID)
+    assert not Order.Status.PAID.can_transition_to(Order.Status.READY)
+    assert Order.Status.PAID.sources() == [Order.Status.READY]
+
+    waiting = Order.objects.create(table_number=1)
+    ready = Order.objects.create(table_number=2, status="ready")
+    changed = Order.objects.transition(
+        [waiting.id, ready.id],
+        Order.Status.READY,
+    )
+
+    assert changed == [waiting.id]
+    waiting.refresh_from_db()
+    assert waiting.status == "ready"
+    assert waiting.status_changed_at > waiting.created_at
+
+
+def test_validated_save_skips_full_clean(order, dish):
+    # Проверенный экземпляр не повторяет SELECT-ы full_clean(),
+    # а дубликат отклоняется ограничением БД
+    with CaptureQueriesContext(connection) as checked:
+        Order(table_number=2).save()
+    with CaptureQueriesContext(connection) as validated:
+        Order(table_number=3).save(validated=True)
+    assert len(validated) < len(checked)
+
+    with CaptureQueriesContext(connection) as checked:
+        OrderItem(order=order, dish=dish, quantity=1).save()
+    second_dish = Dish.objects.create(name="Суп", price=5)
+    with CaptureQueriesContext(connection) as validated:
+        OrderItem(order=order, dish=second_dish, quantity=1).save(
+            validated=True,
+        )
+    assert len(validated) < len(checked)
+
+    with pytest.raises(ValidationError) as error:
+        with transaction.atomic():
+            Order(table_number=order.table_number).save(validated=True)
+    assert "table_number" in error.value.message_dict
+    with pytest.raises(ValidationError) as error:
+        with transaction.atomic():
+            OrderItem(order=order, dish=dish, quantity=1).save(
+                validated=True,
+            )
+    assert NON_FIELD_ERRORS in error.value.message_dict
+    assert Order.objects.count() == 3
+
+
+def test_order_total_limit_on_item_save(order, dish):
+    # Сумма, которая не помещается в total_amount, не сохраняется
+    with pytest.raises(ValidationError):
+        OrderItem(order=order, dish=dish, quantity=10**15).save()
+    with pytest.raises(ValidationError):
+        with transaction.atomic():
+            OrderItem(order=order, dish=dish, quantity=10**15).save(
+                validated=True,
+            )
+    order.refresh_from_db()
+    assert order.total_amount == 0
+    assert not order.order_items.exists()
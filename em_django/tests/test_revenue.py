@@ -0,0 +1,218 @@
+import datetime
+import threading
+import time
+from decimal import Decimal
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from cafe_em.models import (
+    REVENUE_VERSION,
+    Dish,
+    Order,
+    OrderItem,
+    OrderQuerySet,
+    RevenueRollup,
+)
+from cafe_em.revenue import paid_total
+from cafe_em.versioning import get_version
+
+
+@pytest.fixture
+def paid_order(db):
+    dish = Dish.objects.create(name="Борщ", price=10.00)
+    order = Order.objects.create(table_number=1, status="paid")
+    OrderItem.objects.create(order=order, dish=dish, quantity=2)
+    return order
+
+
+def test_paid_total_is_cached(paid_order):
+    assert paid_total() == Decimal("20.00")
+
+    with CaptureQueriesContext(connection) as queries:
+        assert paid_total() == Decimal("20.00")
+    assert len(queries) == 0
+
+
+def test_paid_total_follows_status_and_items(paid_order):
+    assert paid_total() == Decimal("20.00")
+
+    item = paid_order.order_items.get()
+    item.quantity = 3
+    item.save()
+    assert paid_total() == Decimal("30.00")
+
+    paid_order.status = "ready"
+    paid_order.save()
+    assert paid_total() == Decimal("0.00")
+
+    waiting = Order.objects.create(table_number=2)
+    waiting.status = "paid"
+    waiting.save()
+    order = Order.objects.get(pk=paid_order.pk)
+    order.status = "paid"
+    order.save()
+    assert paid_total() == Decimal("30.00")
+
+    order.delete()
+    assert paid_total() == Decimal("0.00")
+
+
+def test_unpaid_item_changes_keep_revenue_cache(paid_order):
+    dish = Dish.objects.get()
+    waiting = Order.objects.create(table_number=2)
+    version = get_version(REVENUE_VERSION)
+
+    item = OrderItem.objects.create(order=waiting, dish=dish, quantity=1)
+    item.quantity = 2
+    item.save()
+    OrderItem.objects.increment(waiting.pk, dish.pk, 3)
+    OrderItem.objects.decrement(waiting.pk, dish.pk, 1)
+    item.refresh_from_db()
+    item.delete()
+    assert get_version(REVENUE_VERSION) == version
+
+    OrderItem.objects.increment(paid_order.pk, dish.pk)
+    assert get_version(REVENUE_VERSION) != version
+    assert paid_total() == Decimal("30.00")
+
+
+def test_paid_total_single_flight(db, monkeypatch):
+    calls = []
+
+    def slow_paid_total(queryset):
+        calls.append(1)
+        time.sleep(0.1)
+        return Decimal("42.00")
+
+    monkeypatch.setattr(OrderQuerySet, "paid_total", slow_paid_total)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(paid_total()))
+        for _ in range(8)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == [Decimal("42.00")] * 8
+    assert len(calls) == 1
+
+
+def _rollups():
+    return list(
+        RevenueRollup.objects.values_list("revenue", "orders_count"),
+    )
+
+
+def test_order_timestamps_follow_status(paid_order):
+    assert paid_order.created_at is not None
+    assert paid_order.paid_at is not None
+
+    order = Order.objects.get(pk=paid_order.pk)
+    order.status = "ready"
+    order.save()
+    order.refresh_from_db()
+    assert order.paid_at is None
+    assert order.status_changed_at >= order.created_at
+
+
+def test_rollups_follow_paid_orders(paid_order):
+    assert _rollups() == [(Decimal("20.00"), 1)]
+
+    item = paid_order.order_items.get()
+    item.quantity = 3
+    item.save()
+    assert _rollups() == [(Decimal("30.00"), 1)]
+
+    other = Order.objects.create(table_number=2)
+    OrderItem.objects.create(order=other, dish=item.dish, quantity=1)
+    assert _rollups() == [(Decimal("30.00"), 1)]
+    other.status = "paid"
+    other.save()
+    assert _rollups() == [(Decimal("40.00"), 2)]
+
+    order = Order.objects.get(pk=paid_order.pk)
+    order.status = "waiting"
+    order.save()
+    assert _rollups() == [(Decimal("10.00"), 1)]
+
+    other.delete()
+    assert _rollups() == []
+
+
+def test_rollup_refresh_recounts_locked_bucket(paid_order):
+    # Строка часа пересчитывается целиком после блокировки,
+    # поэтому устаревшее значение в ней не сохраняется
+    RevenueRollup.objects.update(revenue=Decimal("1.00"), orders_count=5)
+    moment = paid_order.paid_at
+    later = moment + datetime.timedelta(hours=2)
+
+    with CaptureQueriesContext(connection) as queries:
+        RevenueRollup.objects.refresh([moment, later])
+
+    assert _rollups() == [(Decimal("20.00"), 1)]
+    selects = [
+        query["sql"]
+        for query in queries
+        if query["sql"].startswith('SELECT "cafe_em_revenuerollup"')
+    ]
+    assert len(selects) == 2
+
+
+def test_rebuild_revenue_rollups(paid_order):
+    day = timezone.localdate(paid_order.paid_at)
+    RevenueRollup.objects.all().delete()
+    out = StringIO()
+
+    call_command("rebuild_revenue_rollups", stdout=out)
+
+    assert "Строк выручки: 1" in out.getvalue()
+    assert list(RevenueRollup.objects.values("day", "revenue")) == [
+        {"day": day, "revenue": Decimal("20.00")},
+    ]
+
+
+def test_revenue_api_sums_rollups(paid_order):
+    day = timezone.localdate(paid_order.paid_at)
+    RevenueRollup.objects.create(
+        day=day - datetime.timedelta(days=1),
+        hour=23,
+        revenue=Decimal("5.00"),
+        orders_count=1,
+    )
+    url = reverse("cafe_em:order-revenue")
+    client = APIClient()
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(
+            url,
+            {"date_from": day - datetime.timedelta(days=1), "date_to": day},
+        )
+    assert response.status_code == status.HTTP_200_OK
+    assert "cafe_em_order" not in " ".join(
+        query["sql"] for query in queries.captured_queries
+    )
+    assert response.data["revenue"] == Decimal("25.00")
+    assert response.data["orders_count"] == 2
+    assert [row["revenue"] for row in response.data["rows"]] == [
+        Decimal("5.00"),
+        Decimal("20.00"),
+    ]
+
+    response = client.get(url, {"date_from": day, "date_to": day})
+    assert response.data["revenue"] == Decimal("20.00")
+
+    response = client.get(
+        url,
+        {"date_from": day, "date_to": day - datetime.timedelta(days=1)},
+    )
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
@@ -1,8 +1,19 @@
+from decimal import Decimal
+
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import serializers
+
+from cafe_em.menu import menu
 from cafe_em.serializers import (
+    BulkRelatedField,
+    BulkRelatedListSerializer,
     DishSerializer,
+    OrderCreateSerializer,
     OrderSerializer,
     OrderItemSerializer,
+    OrderUpdateSerializer,
 )
 from cafe_em.models import Order, Dish, OrderItem
 
@@ -101,3 +112,186 @@ def test_order_item_serializer_invalid_quantity():
 
     assert not serializer.is_valid()
     assert "quantity" in serializer.errors
+
+
+@pytest.mark.django_db
+def test_order_create_serializer_constant_queries():
+    dishes = [
+        Dish.objects.create(name=f"Блюдо {number}", price=10.00)
+        for number in range(30)
+    ]
+    data = {
+        "table_number": 1,
+        "order_items": [{"dish": dish.id, "quantity": 2} for dish in dishes],
+    }
+
+    serializer = OrderCreateSerializer(data=data)
+    with CaptureQueriesContext(connection) as queries:
+        assert serializer.is_valid(), serializer.errors
+        order = serializer.save()
+
+    assert len(queries) <= 8
+    assert order.order_items.count() == 30
+    order.refresh_from_db()
+    assert order.total_amount == Decimal("600.00")
+
+
+@pytest.mark.django_db
+def test_order_create_serializer_unknown_dish():
+    dish = Dish.objects.create(name="Борщ", price=10.00)
+    serializer = OrderCreateSerializer(
+        data={
+            "table_number": 1,
+            "order_items": [
+                {"dish": dish.id, "quantity": 1},
+                {"dish": dish.id + 100, "quantity": 1},
+            ],
+        }
+    )
+
+    assert not serializer.is_valid()
+    assert serializer.errors["order_items"][0] == {}
+    assert "dish" in serializer.errors["order_items"][1]
+    assert not Order.objects.exists()
+
+
+@pytest.mark.django_db
+def test_order_create_serializer_rejects_huge_quantity():
+    dish = Dish.objects.create(name="Борщ", price=10.00)
+    serializer = OrderCreateSerializer(
+        data={
+            "table_number": 1,
+            "order_items": [{"dish": dish.id, "quantity": 10**20}],
+        }
+    )
+    assert not serializer.is_valid()
+    assert "quantity" in serializer.errors["order_items"][0]
+
+    serializer = OrderCreateSerializer(
+        data={
+            "table_number": 1,
+            "order_items": [{"dish": dish.id, "quantity": 10**12}],
+        }
+    )
+    assert not serializer.is_valid()
+    assert "order_items" in serializer.errors
+    assert not Order.objects.exists()
+
+
+@pytest.mark.django_db
+def test_order_update_serializer_diffs_items():
+    soup = Dish.objects.create(name="Борщ", price=10.00)
+    salad = Dish.objects.create(name="Салат", price=5.00)
+    tea = Dish.objects.create(name="Чай", price=2.00)
+    order = Order.objects.create(table_number=1, status="waiting")
+    kept = OrderItem.objects.create(order=order, dish=soup, quantity=1)
+    OrderItem.objects.create(order=order, dish=salad, quantity=1)
+
+    serializer = OrderUpdateSerializer(
+        order,
+        data={
+            "order_items": [
+                {"dish": soup.id, "quantity": 3},
+                {"dish": tea.id, "quantity": 2},
+            ]
+        },
+        partial=True,
+    )
+    assert serializer.is_valid(), serializer.errors
+    serializer.save()
+
+    items = {item.dish_id: item for item in order.order_items.all()}
+    assert set(items) == {soup.id, tea.id}
+    assert items[soup.id].pk == kept.pk
+    assert items[soup.id].quantity == 3
+    order.refresh_from_db()
+    assert order.total_amount == Decimal("34.00")
+
+
+@pytest.mark.django_db
+def test_order_update_serializer_adds_one_item_without_rewrites():
+    dishes = [
+        Dish.objects.create(name=f"Блюдо {number}", price=1.00)
+        for number in range(21)
+    ]
+    order = Order.objects.create(table_number=1, status="waiting")
+    OrderItem.objects.bulk_create(
+        OrderItem(order=order, dish=dish, quantity=1) for dish in dishes[:20]
+    )
+
+    serializer = OrderUpdateSerializer(
+        order,
+        data={
+            "order_items": [
+                {"dish": dish.id, "quantity": 1} for dish in dishes
+            ]
+        },
+        partial=True,
+    )
+    assert serializer.is_valid(), serializer.errors
+    with CaptureQueriesContext(connection) as queries:
+        serializer.save()
+
+    statements = [query["sql"].split()[0] for query in queries]
+    assert statements.count("DELETE") == 0
+    assert statements.count("INSERT") == 1
+    assert order.order_items.count() == 21
+    assert order.total_amount == Decimal("21.00")
+
+
+@pytest.mark.django_db
+def test_order_update_serializer_resolves_dishes_in_bulk():
+    dishes = [
+        Dish.objects.create(name=f"Блюдо {number}", price=1.00)
+        for number in range(10)
+    ]
+    order = Order.objects.create(table_number=1, status="waiting")
+    menu.in_bulk([])
+    missing = dishes[-1].id + 1
+
+    serializer = OrderUpdateSerializer(
+        order,
+        data={
+            "order_items": [
+                {"dish": dish.id, "quantity": 1} for dish in dishes
+            ]
+            + [
+                {"dish": missing, "quantity": 1},
+                {"dish": "борщ", "quantity": 1},
+            ]
+        },
+        partial=True,
+    )
+    with CaptureQueriesContext(connection) as queries:
+        assert not serializer.is_valid()
+
+    # Известные блюда берутся из меню, ненайденные ищутся одним запросом
+    assert len(queries) == 1
+    errors = serializer.errors["order_items"]
+    assert errors[:10] == [{}] * 10
+    assert errors[10]["dish"] == [f"Блюдо {missing} не найдено."]
+    assert errors[11]["dish"][0].code == "incorrect_type"
+
+
+@pytest.mark.django_db
+def test_bulk_related_field_uses_one_query():
+    class ItemSerializer(serializers.Serializer):
+        order = BulkRelatedField(queryset=Order.objects.all())
+
+        class Meta:
+            list_serializer_class = BulkRelatedListSerializer
+
+    orders = [Order.objects.create(table_number=number) for number in range(5)]
+    serializer = ItemSerializer(
+        data=[{"order": order.id} for order in orders]
+        + [{"order": orders[0].id}],
+        many=True,
+    )
+    with CaptureQueriesContext(connection) as queries:
+        assert serializer.is_valid(), serializer.errors
+
+    assert len(queries) == 1
+    assert [item["order"] for item in serializer.validated_data] == [
+        *orders,
+        orders[0],
+    ]
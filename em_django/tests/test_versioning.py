@@ -0,0 +1,43 @@
+import threading
+
+from django.core.cache import cache
+
+from cafe_em import versioning
+from cafe_em.versioning import get_or_compute
+
+
+def test_get_or_compute_keeps_lock_of_other_process(monkeypatch):
+    monkeypatch.setattr(versioning, "COMPUTE_LOCK_TIMEOUT", 0.1)
+    # Блокировку держит другой процесс, который так и не досчитал.
+    cache.add("report:lock", True, timeout=60)
+
+    assert get_or_compute("report", lambda: 5, timeout=60) == 5
+    assert cache.get("report") == 5
+    assert cache.get("report:lock") is True
+    assert versioning._key_locks == {}
+
+
+def test_get_or_compute_locks_each_key_separately():
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow() -> int:
+        started.set()
+        release.wait(5)
+        return 1
+
+    worker = threading.Thread(
+        target=get_or_compute,
+        args=("slow", slow, 60),
+    )
+    worker.start()
+    try:
+        assert started.wait(5)
+        # Пока считается один ключ, другой считается без ожидания.
+        assert get_or_compute("fast", lambda: 2, timeout=60) == 2
+    finally:
+        release.set()
+        worker.join(5)
+    assert cache.get("slow") == 1
+    assert cache.get("slow:lock") is None
+    assert versioning._key_locks == {}
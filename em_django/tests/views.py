@@ -1,8 +1,12 @@
 import pytest
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 from rest_framework import status
 
+from cafe_em.menu import menu
 from cafe_em.models import Dish, Order, OrderItem
 
 
@@ -39,7 +43,7 @@ class TestOrderAPI:
             "status": "waiting",
         }
         response = self.client.get(url)
-        assert len(response.data) == 1
+        assert len(response.data["results"]) == 1
         response = self.client.post(
             url,
             data,
@@ -50,7 +54,7 @@ class TestOrderAPI:
         assert response.data["status"] == "waiting"
         response = self.client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
+        assert len(response.data["results"]) == 2
 
     def test_filter_by_status(self):
         """
@@ -62,21 +66,170 @@ class TestOrderAPI:
         )
         response = self.client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
+        assert len(response.data["results"]) == 1
         Order.objects.create(
             table_number=2,
             status="waiting",
         )
         response = self.client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
+        assert len(response.data["results"]) == 2
         Order.objects.create(
             table_number=3,
             status="paid",
         )
         response = self.client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
+        assert len(response.data["results"]) == 2
+
+    def test_list_orders_query_count(self):
+        """
+        Тест на постоянное количество запросов при выводе списка заказов
+        """
+        url = reverse("cafe_em:order-list")
+        with CaptureQueriesContext(connection) as few_orders:
+            response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        for table_number in range(2, 12):
+            order = Order.objects.create(
+                table_number=table_number,
+                status="waiting",
+            )
+            OrderItem.objects.create(
+                order=order,
+                dish=self.dish,
+                quantity=table_number,
+            )
+        with CaptureQueriesContext(connection) as many_orders:
+            response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        assert len(many_orders) == len(few_orders)
+        totals = {
+            item["table_number"]: item["total_price"]
+            for item in response.data["results"]
+        }
+        assert totals[1] == 20.00
+        assert totals[11] == 110.00
+
+    def test_list_orders_cursor_pagination(self):
+        """
+        Тест на постраничный вывод заказов по курсору
+        """
+        for table_number in range(2, 8):
+            Order.objects.create(
+                table_number=table_number,
+                status="waiting",
+            )
+        url = reverse("cafe_em:order-list")
+        response = self.client.get(url, {"page_size": 4})
+        assert response.status_code == status.HTTP_200_OK
+        assert "count" not in response.data
+        first_page = [order["id"] for order in response.data["results"]]
+        assert first_page == sorted(first_page, reverse=True)
+        response = self.client.get(response.data["next"])
+        second_page = [order["id"] for order in response.data["results"]]
+        assert len(first_page) == 4
+        assert len(second_page) == 3
+        assert max(second_page) < min(first_page)
+        assert response.data["next"] is None
+
+    def test_search_orders(self):
+        """
+        Тест на поиск заказов по номеру стола, диапазону и статусу
+        """
+        Order.objects.create(table_number=2, status="ready")
+        Order.objects.create(table_number=12, status="paid")
+        url = reverse("cafe_em:order-list")
+
+        def tables(query):
+            response = self.client.get(url, {"search": query})
+            assert response.status_code == status.HTTP_200_OK
+            return sorted(
+                order["table_number"] for order in response.data["results"]
+            )
+
+        assert tables("2") == [2]
+        assert tables("1-2") == [1, 2]
+        assert tables("12 - 2") == [2, 12]
+        assert tables("Готово") == [2]
+        assert tables("paid") == [12]
+        assert tables("в ожидании") == [1]
+        assert tables("стол") == []
+        assert tables("") == [1, 2, 12]
+        huge = "99999999999999999999"
+        assert tables(huge) == []
+        assert tables(f"2-{huge}") == [2, 12]
+        assert tables(f"{huge}-{huge}1") == []
+
+    def test_filter_by_status_query_count(self):
+        """
+        Тест на постоянное количество запросов при фильтрации по статусу
+        """
+        url = reverse(
+            "cafe_em:order-filter-by-status",
+            kwargs={"status": "waiting"},
+        )
+        with CaptureQueriesContext(connection) as few_orders:
+            self.client.get(url)
+        for table_number in range(2, 7):
+            order = Order.objects.create(
+                table_number=table_number,
+                status="waiting",
+            )
+            OrderItem.objects.create(
+                order=order,
+                dish=self.dish,
+                quantity=1,
+            )
+        with CaptureQueriesContext(connection) as many_orders:
+            response = self.client.get(url)
+        assert len(response.data["results"]) == 6
+        assert len(many_orders) == len(few_orders)
+
+    def test_bulk_create_orders(self):
+        """
+        Тест на пакетную загрузку заказов с отчетом об ошибках
+        """
+        url = reverse("cafe_em:order-bulk-create-orders")
+        data = [
+            {
+                "table_number": 2,
+                "order_items": [{"dish": self.dish.id, "quantity": 2}],
+            },
+            {"table_number": 1, "order_items": []},
+            {
+                "table_number": 3,
+                "status": "paid",
+                "order_items": [{"dish": self.dish.id + 100}],
+            },
+            {"table_number": 2, "order_items": []},
+            {"table_number": 4, "status": "wrong", "order_items": []},
+            {"table_number": 5, "order_items": []},
+            {"table_number": 10**20, "order_items": []},
+            {
+                "table_number": 6,
+                "order_items": [{"dish": self.dish.id, "quantity": 10**12}],
+            },
+        ]
+        menu.in_bulk([])
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data, format="json")
+        assert response.status_code == status.HTTP_201_CREATED
+        assert len(response.data["created"]) == 2
+        assert [error["index"] for error in response.data["errors"]] == [
+            1,
+            2,
+            3,
+            4,
+            6,
+            7,
+        ]
+        # Цены блюд для сумм читаются из БД одним запросом.
+        assert len(queries) <= 7
+        order = Order.objects.get(table_number=2)
+        assert order.total_amount == 20.00
+        assert order.order_items.get().quantity == 2
+        assert Order.objects.filter(table_number=5).exists()
 
     def test_partial_update_order(self):
         """
@@ -101,6 +254,165 @@ class TestOrderAPI:
             format="json",
         )
         assert response.status_code == status.HTTP_400_BAD_REQUEST
+        response = self.client.patch(
+            url,
+            {"order_items": [{"dish": 10**20, "quantity": 1}]},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "dish" in response.data["order_items"][0]
+        response = self.client.patch(
+            url,
+            {"order_items": [{"dish": self.dish.id, "quantity": 10**15}]},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "order_items" in response.data
+        response = self.client.get(reverse("cafe_em:order-list"))
+        assert response.status_code == status.HTTP_200_OK
+        response = self.client.post(
+            reverse("cafe_em:order-create-order"),
+            {"table_number": 9, "order_items": [{"dish": 10**20}]},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+    def test_order_table_number_taken(self):
+        """
+        Тест на то, что занятый номер стола отклоняет БД
+        и API возвращает ошибку поля, а не 500
+        """
+        other = Order.objects.create(table_number=2)
+        response = self.client.post(
+            reverse("cafe_em:order-create-order"),
+            {"table_number": 1, "order_items": []},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "table_number" in response.data
+        response = self.client.patch(
+            reverse(
+                "cafe_em:order-partial-update-order",
+                kwargs={"pk": other.id},
+            ),
+            {"table_number": 1},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "table_number" in response.data
+        other.refresh_from_db()
+        assert other.table_number == 2
+        assert Order.objects.count() == 2
+
+    def test_increment_order_item(self):
+        """
+        Тест на увеличение количества блюда и добавление новой позиции
+        """
+        url = reverse(
+            "cafe_em:order-change-item-quantity",
+            kwargs={
+                "pk": self.order.id,
+                "dish_id": self.dish.id,
+                "operation": "increment",
+            },
+        )
+        response = self.client.post(url, {"quantity": 3}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        self.order_item.refresh_from_db()
+        assert self.order_item.quantity == 5
+        assert response.data["total_price"] == 50.00
+
+        tea = Dish.objects.create(name="Чай", price=2.00)
+        url = reverse(
+            "cafe_em:order-change-item-quantity",
+            kwargs={
+                "pk": self.order.id,
+                "dish_id": tea.id,
+                "operation": "increment",
+            },
+        )
+        response = self.client.post(url, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert self.order.order_items.get(dish=tea).quantity == 1
+        assert response.data["total_price"] == 52.00
+
+    def test_decrement_order_item(self):
+        """
+        Тест на уменьшение количества блюда до удаления позиции
+        """
+        url = reverse(
+            "cafe_em:order-change-item-quantity",
+            kwargs={
+                "pk": self.order.id,
+                "dish_id": self.dish.id,
+                "operation": "decrement",
+            },
+        )
+        response = self.client.post(url, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["total_price"] == 10.00
+        response = self.client.post(url, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["order_items"] == []
+        assert response.data["total_price"] == 0
+        response = self.client.post(url, format="json")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_change_item_quantity_out_of_range(self):
+        """
+        Тест на то, что огромные id блюда и количество
+        дают 404 и 400, а не 500
+        """
+        for operation in ("increment", "decrement"):
+            url = reverse(
+                "cafe_em:order-change-item-quantity",
+                kwargs={
+                    "pk": self.order.id,
+                    "dish_id": 10**20,
+                    "operation": operation,
+                },
+            )
+            response = self.client.post(url, format="json")
+            assert response.status_code == status.HTTP_404_NOT_FOUND
+        url = reverse(
+            "cafe_em:order-change-item-quantity",
+            kwargs={
+                "pk": self.order.id,
+                "dish_id": self.dish.id,
+                "operation": "decrement",
+            },
+        )
+        response = self.client.post(url, {"quantity": 10**20}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        url = reverse(
+            "cafe_em:order-change-item-quantity",
+            kwargs={
+                "pk": self.order.id,
+                "dish_id": self.dish.id,
+                "operation": "increment",
+            },
+        )
+        response = self.client.post(url, {"quantity": 10**15}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        expensive = Dish.objects.create(name="Икра", price=10**8 - 1)
+        url = reverse(
+            "cafe_em:order-change-item-quantity",
+            kwargs={
+                "pk": self.order.id,
+                "dish_id": expensive.id,
+                "operation": "increment",
+            },
+        )
+        response = self.client.post(url, {"quantity": 1000}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert "quantity" in response.data
+        self.order_item.refresh_from_db()
+        assert self.order_item.quantity == 2
+        assert not self.order.order_items.filter(dish=expensive).exists()
+        self.order.refresh_from_db()
+        assert self.order.total_amount == 20
+        response = self.client.get(reverse("cafe_em:order-list"))
+        assert response.status_code == status.HTTP_200_OK
 
     def test_delete_order(self):
         """Тест на корректное удаление стола"""
@@ -118,6 +430,152 @@ class TestOrderAPI:
         response = self.client.delete(url)
         assert response.status_code == status.HTTP_404_NOT_FOUND
 
+    def test_change_status(self):
+        """
+        Тест на смену статуса одним условным UPDATE
+        """
+        url = reverse(
+            "cafe_em:order-change-status",
+            kwargs={"pk": self.order.id},
+        )
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                url,
+                {"status": "ready"},
+                format="json",
+            )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data == {"id": self.order.id, "status": "ready"}
+        [query] = queries.captured_queries
+        assert query["sql"].startswith("UPDATE")
+        self.order.refresh_from_db()
+        assert self.order.status == "ready"
+
+        response = self.client.post(url, {"status": "paid"}, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        self.order.refresh_from_db()
+        assert self.order.paid_at is not None
+        response = self.client.get(reverse("cafe_em:order-total-sum"))
+        assert response.data["total_sum"] == 20.00
+
+    def test_change_status_rejects_illegal_and_stale(self):
+        """
+        Тест на запрещённые переходы и проигранную гонку
+        """
+        url = reverse(
+            "cafe_em:order-change-status",
+            kwargs={"pk": self.order.id},
+        )
+        response = self.client.post(url, {"status": "paid"}, format="json")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert response.data["status"] == "waiting"
+
+        response = self.client.post(
+            url,
+            {"status": "paid", "from_status": "waiting"},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        Order.objects.filter(pk=self.order.id).update(status="ready")
+        response = self.client.post(
+            url,
+            {"status": "ready", "from_status": "waiting"},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_409_CONFLICT
+        assert response.data["status"] == "ready"
+
+        url = reverse(
+            "cafe_em:order-change-status",
+            kwargs={"pk": self.order.id + 100},
+        )
+        response = self.client.post(url, {"status": "ready"}, format="json")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+        url = reverse(
+            "cafe_em:order-change-status",
+            kwargs={"pk": 10**20},
+        )
+        response = self.client.post(url, {"status": "ready"}, format="json")
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_bulk_change_status(self):
+        """
+        Тест на пакетную смену статуса с результатом по каждому заказу
+        """
+        ready = Order.objects.create(table_number=2, status="ready")
+        paid = Order.objects.create(table_number=3, status="paid")
+        url = reverse("cafe_em:order-bulk-change-status")
+        data = {
+            "status": "paid",
+            "ids": [ready.id, self.order.id, paid.id, paid.id + 100],
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["changed"] == 1
+        assert [
+            (result["id"], result["outcome"], result["status"])
+            for result in response.data["results"]
+        ] == [
+            (ready.id, "changed", "paid"),
+            (self.order.id, "rejected", "waiting"),
+            (paid.id, "rejected", "paid"),
+            (paid.id + 100, "not_found", None),
+        ]
+        updates = [
+            query
+            for query in queries.captured_queries
+            if query["sql"].startswith('UPDATE "cafe_em_order"')
+        ]
+        assert len(updates) == 1
+        ready.refresh_from_db()
+        assert ready.paid_at is not None
+
+    def test_bulk_change_status_by_filter(self):
+        """
+        Тест на пакетную смену статуса по фильтру
+        """
+        other = Order.objects.create(table_number=2)
+        Order.objects.create(table_number=30)
+        url = reverse("cafe_em:order-bulk-change-status")
+        data = {
+            "status": "ready",
+            "filter": {"status": "waiting", "search": "1-10"},
+        }
+        response = self.client.post(url, data, format="json")
+        assert response.status_code == status.HTTP_200_OK
+        assert [result["id"] for result in response.data["results"]] == [
+            self.order.id,
+            other.id,
+        ]
+        assert response.data["changed"] == 2
+        assert Order.objects.filter(status="ready").count() == 2
+
+        response = self.client.post(
+            url,
+            {"status": "ready", "ids": [1], "filter": {"status": "waiting"}},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = self.client.post(
+            url,
+            {"status": "waiting", "ids": [10**20]},
+            format="json",
+        )
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        response = self.client.post(
+            url,
+            {
+                "status": "waiting",
+                "filter": {"search": "1-99999999999999999999"},
+            },
+            format="json",
+        )
+        assert response.status_code == status.HTTP_200_OK
+        assert response.data["changed"] == 2
+
     def test_total_sum(self):
         """Тест на корректное отображение блока общая сумма"""
         self.order.status = "paid"
@@ -189,7 +647,7 @@ class TestDishAPI:
         url = reverse("cafe_em:dish-list")
         response = self.client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 1
+        assert len(response.data["results"]) == 1
         data = {"name": "Вареники", "price": 100.00}
         response = self.client.post(
             url,
@@ -198,7 +656,7 @@ class TestDishAPI:
         )
         response = self.client.get(url)
         assert response.status_code == status.HTTP_200_OK
-        assert len(response.data) == 2
+        assert len(response.data["results"]) == 2
 
     def test_retrieve_dish(self):
         """Проверяем корректность отображения блюдa"""
@@ -268,3 +726,134 @@ class TestDishAPI:
         )
         response = self.client.delete(url)
         assert response.status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+class TestOrderWebViews:
+    """
+    Тесты для веб-представлений заказов.
+    """
+
+    def setup_method(self):
+        self.client = Client()
+        self.dishes = [
+            Dish.objects.create(name=f"Блюдо {number}", price=10.00)
+            for number in range(5)
+        ]
+        self.order = Order.objects.create(
+            table_number=1,
+            status="waiting",
+        )
+        OrderItem.objects.create(
+            order=self.order,
+            dish=self.dishes[1],
+            quantity=2,
+        )
+
+    def _count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        assert response.status_code == status.HTTP_200_OK
+        return len(queries), response.content.decode()
+
+    def test_order_forms_share_dish_choices(self):
+        """
+        Тест на постоянное количество запросов на страницах с формами
+        """
+        create_url = reverse("cafe_em:order_form")
+        update_url = reverse(
+            "cafe_em:order_update_form",
+            kwargs={"pk": self.order.id},
+        )
+        self.client.get(create_url)
+        few_create, _ = self._count_queries(create_url)
+        few_update, _ = self._count_queries(update_url)
+
+        for number in range(5, 100):
+            Dish.objects.create(name=f"Блюдо {number}", price=10.00)
+        self.client.get(create_url)
+        many_create, content = self._count_queries(create_url)
+        many_update, update_content = self._count_queries(update_url)
+
+        assert many_create == few_create
+        assert many_update == few_update
+        assert content.count("Блюдо 99</option>") == 4
+        assert (
+            f'<option value="{self.dishes[1].id}" selected>'
+            in update_content
+        )
+
+    def test_order_list_and_detail_query_count(self):
+        """
+        Тест на постоянное количество запросов в списке и карточке заказа
+        """
+        list_url = reverse("cafe_em:order_list")
+        detail_url = reverse(
+            "cafe_em:order_detail",
+            kwargs={"pk": self.order.id},
+        )
+        few_list, _ = self._count_queries(list_url)
+        few_detail, _ = self._count_queries(detail_url)
+
+        for dish in self.dishes[2:]:
+            OrderItem.objects.create(order=self.order, dish=dish, quantity=1)
+        for table_number in range(2, 8):
+            order = Order.objects.create(
+                table_number=table_number,
+                status="ready",
+            )
+            for dish in self.dishes:
+                OrderItem.objects.create(order=order, dish=dish, quantity=1)
+        many_list, content = self._count_queries(list_url)
+        many_detail, detail_content = self._count_queries(detail_url)
+
+        assert many_list == few_list
+        assert many_detail == few_detail
+        assert content.count("Общая стоимость:</strong> 50.00") == 5
+        assert "Общая стоимость:</strong> 50.00" in detail_content
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(list_url)
+        assert not any("COUNT(" in query["sql"] for query in queries)
+        assert '<a href="?page=2">' in response.content.decode()
+        response = self.client.get(list_url, {"page": 2})
+        assert response.status_code == status.HTTP_200_OK
+        content = response.content.decode()
+        assert content.count("Общая стоимость:</strong>") == 2
+        assert '<a href="?page=3">' not in content
+        response = self.client.get(list_url, {"page": 3})
+        assert response.status_code == status.HTTP_404_NOT_FOUND
+
+    def test_create_order_with_items(self):
+        """
+        Тест на создание заказа через форму с позициями
+        """
+        data = {
+            "table_number": 2,
+            "order_items-TOTAL_FORMS": 2,
+            "order_items-INITIAL_FORMS": 0,
+            "order_items-0-dish": self.dishes[0].id,
+            "order_items-0-quantity": 3,
+            "order_items-1-dish": "",
+            "order_items-1-quantity": 1,
+        }
+        response = self.client.post(reverse("cafe_em:order_form"), data)
+        assert response.status_code == status.HTTP_302_FOUND
+        order = Order.objects.get(table_number=2)
+        assert order.order_items.get().dish == self.dishes[0]
+        assert order.total_amount == 30.00
+
+        data["table_number"] = 3
+        data["order_items-0-dish"] = 100500
+        response = self.client.post(reverse("cafe_em:order_form"), data)
+        assert response.status_code == status.HTTP_200_OK
+        assert not Order.objects.filter(table_number=3).exists()
+
+        data["order_items-0-dish"] = self.dishes[0].id
+        data["order_items-0-quantity"] = 10**15
+        response = self.client.post(reverse("cafe_em:order_form"), data)
+        assert response.status_code == status.HTTP_200_OK
+        assert "Сумма заказа должна быть меньше" in response.content.decode()
+        assert not Order.objects.filter(table_number=3).exists()
+        response = self.client.get(reverse("cafe_em:order_list"))
+        assert response.status_code == status.HTTP_200_OK